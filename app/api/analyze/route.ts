@@ -19,6 +19,8 @@ export async function POST(request: NextRequest) {
         'Content-Type': 'application/json',
       },
       body: JSON.stringify({ idea }),
+      // Abort the backend request (and its agent calls) if the browser goes away
+      signal: request.signal,
     })
 
     if (!response.ok) {
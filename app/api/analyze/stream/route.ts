@@ -0,0 +1,45 @@
+import { NextRequest, NextResponse } from 'next/server'
+
+export async function POST(request: NextRequest) {
+  try {
+    const { idea } = await request.json()
+
+    if (!idea || idea.trim().length === 0) {
+      return NextResponse.json(
+        { error: 'Idea description is required' },
+        { status: 400 }
+      )
+    }
+
+    // Proxy the backend's Server-Sent Events stream without buffering it
+    const backendUrl = process.env.BACKEND_URL || 'http://localhost:8000'
+    const response = await fetch(`${backendUrl}/analyze/stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ idea }),
+      // Abort the backend request (and its agent calls) if the browser goes away
+      signal: request.signal,
+    })
+
+    if (!response.ok || !response.body) {
+      throw new Error(`Backend responded with status: ${response.status}`)
+    }
+
+    return new Response(response.body, {
+      headers: {
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        'Connection': 'keep-alive',
+      },
+    })
+
+  } catch (error) {
+    console.error('Analysis stream error:', error)
+    return NextResponse.json(
+      { error: 'Failed to analyze idea. Please try again.' },
+      { status: 500 }
+    )
+  }
+}
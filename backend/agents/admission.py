@@ -0,0 +1,93 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+class Overloaded(Exception):
+    """Raised when the admission queue is full and no degraded tier is configured"""
+
+class AdmissionController:
+    """Caps concurrent full analyses and sheds excess load onto the heuristic-only tier
+
+    Requests take a full-tier slot when one is free. Once `degrade_at` requests are
+    already queued (or a request waits longer than queue_timeout), new requests get
+    the zero-network degraded tier instead of waiting behind a growing backlog.
+    """
+
+    def __init__(self, max_concurrent: int = 16, max_queue: int = 64,
+                 degrade_at: Optional[int] = 16, queue_timeout: Optional[float] = 10.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.degrade_at = degrade_at
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+        self.active = 0
+        self.waiting = 0
+        self.admitted = {"full": 0, "degraded": 0}
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        degrade_at = os.getenv("ANALYZE_DEGRADE_QUEUE", "16")
+        queue_timeout = os.getenv("ANALYZE_QUEUE_TIMEOUT", "10")
+        return cls(
+            max_concurrent=int(os.getenv("ANALYZE_MAX_CONCURRENCY", "16")),
+            max_queue=int(os.getenv("ANALYZE_MAX_QUEUE", "64")),
+            # Empty values disable load shedding / the queue wait limit
+            degrade_at=int(degrade_at) if degrade_at else None,
+            queue_timeout=float(queue_timeout) if queue_timeout else None
+        )
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[str]:
+        """Yield the tier to run: "full" while holding a slot, or "degraded" without one"""
+        if self._semaphore.locked():
+            acquired = await self._queue_for_slot()
+        else:
+            # A slot is free: take it without suspending, so it is not counted as queued
+            await self._semaphore.acquire()
+            acquired = True
+
+        if not acquired:
+            self.admitted["degraded"] += 1
+            yield "degraded"
+            return
+
+        self.admitted["full"] += 1
+        self.active += 1
+        try:
+            yield "full"
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    async def _queue_for_slot(self) -> bool:
+        """Wait for a full-tier slot; False means shed this request to the degraded tier"""
+        if self.degrade_at is not None and self.waiting >= self.degrade_at:
+            return False
+        if self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise Overloaded(f"Analysis queue is full ({self.max_queue} waiting)")
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            if self.degrade_at is None:
+                self.rejected += 1
+                raise Overloaded(f"No analysis slot within {self.queue_timeout:.0f}s")
+            return False
+        finally:
+            self.waiting -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "active": self.active,
+            "waiting": self.waiting,
+            "degrade_at": self.degrade_at,
+            "admitted": dict(self.admitted),
+            "rejected": self.rejected
+        }
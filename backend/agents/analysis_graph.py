@@ -0,0 +1,143 @@
+import asyncio
+import random
+from typing import Any, Dict, Iterable, Optional
+from .dag import DAG, Node
+from .gemini_schemas import Breakdown
+from .streaming_json import PartialResult
+
+# Sections in response order; the breakdown is only returned when asked for
+RESPONSE_SECTIONS = ("market_analysis", "competition", "financial_projections", "risks", "recommendation")
+
+# Fraction of the *remaining* request budget each node may use when it starts
+# (the insight node gets whatever is left)
+BUDGET_SHARES = {"breakdown": 0.35, "agents": 0.75, "insight": 1.0}
+
+# (section, attribute of the agent producing it, RNG stream, retries, issues SerpAPI searches)
+AGENT_SECTIONS = (
+    ("market_analysis", "market_agent", "market", 1, True),
+    ("competition", "competitor_agent", "competitor", 1, True),
+    ("financial_projections", "financial_agent", "financial", 0, False),  # Local maths, a retry would not help
+    ("risks", "risk_agent", "risk", 1, True)
+)
+
+def analysis_context(idea: str, rngs: Optional[Dict[str, random.Random]] = None,
+                     deep: bool = False, speculative: bool = False,
+                     sections: Iterable[str] = RESPONSE_SECTIONS,
+                     breakdown: Optional[Dict[str, Any]] = None,
+                     stream_breakdown: bool = False) -> Dict[str, Any]:
+    """Per-request inputs shared by every node of the analysis graph
+
+    speculative starts the searches of the requested sections from the local breakdown
+    guess while the LLM breakdown is still running. A breakdown computed up front (e.g. by
+    the batch grouper) is used as-is; otherwise stream_breakdown streams it from Gemini so
+    each agent starts once the fields it reads have arrived.
+    """
+    return {"idea": idea, "rngs": rngs or {}, "deep": deep, "speculative": speculative, "sections": set(sections),
+            "breakdown": breakdown, "stream_breakdown": stream_breakdown}
+
+def public_breakdown(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """The breakdown section as clients see it, whatever extra fields the agents were handed
+
+    With GEMINI_FUSED_BREAKDOWN the breakdown call also lists competitors; the competitor
+    agent reads them from breakdown_source, so they never reach the response or its cache.
+    """
+    return {name: value for name, value in fields.items() if name in Breakdown.model_fields}
+
+def build_analysis_graph(agents: Any) -> DAG:
+    """(breakdown_source, prefetch) -> market / competition / financials / risks -> recommendation
+
+    breakdown_source hands the agents a PartialResult the breakdown is filled into, and each
+    agent waits only for its BREAKDOWN_FIELDS; the breakdown node resolves once it is whole.
+    agents provides breakdown_agent, market_agent, ... insight_agent. They are only looked
+    up when their node runs, so lazily built agents stay unbuilt for unrequested sections.
+    """
+    async def breakdown_source(inputs: Dict[str, Any], ctx: Dict[str, Any]) -> PartialResult:
+        if ctx["breakdown"] is not None:
+            return PartialResult(ctx["breakdown"])
+        partial = PartialResult()
+        partial.producer = asyncio.ensure_future(
+            agents.breakdown_agent.analyze_into(ctx["idea"], partial, stream=ctx["stream_breakdown"])
+        )
+        return partial
+
+    async def local_breakdown_source(inputs: Dict[str, Any], ctx: Dict[str, Any]) -> PartialResult:
+        if ctx["breakdown"] is not None:
+            return PartialResult(ctx["breakdown"])
+        return PartialResult(agents.breakdown_agent._create_smart_fallback_breakdown(ctx["idea"]))
+
+    async def breakdown(inputs: Dict[str, Any], ctx: Dict[str, Any]) -> Dict[str, Any]:
+        # Cancelling this node (budget missed, client gone) cancels the Gemini stream with it
+        return public_breakdown(await inputs["breakdown_source"].complete())
+
+    async def local_breakdown(inputs: Dict[str, Any], ctx: Dict[str, Any]) -> Dict[str, Any]:
+        return public_breakdown(inputs["breakdown_source"].settle(
+            agents.breakdown_agent._create_smart_fallback_breakdown(ctx["idea"])
+        ))
+
+    async def prefetch(inputs: Dict[str, Any], ctx: Dict[str, Any]) -> Dict[str, Any]:
+        """Start the searching agents' SerpAPI queries from the local breakdown guess"""
+        if not ctx["speculative"]:
+            return {}
+        guess = agents.breakdown_agent._create_smart_fallback_breakdown(ctx["idea"])
+        started = {}
+        for section, agent_name, _, _, searches in AGENT_SECTIONS:
+            if searches and section in ctx["sections"]:
+                agent = getattr(agents, agent_name)
+                started[section] = agent.serpapi.prefetch(agent.search_requests(guess, deep=ctx["deep"]))
+        return started
+
+    async def no_prefetch(inputs: Dict[str, Any], ctx: Dict[str, Any]) -> Dict[str, Any]:
+        return {}
+
+    def release_prefetch(started: Dict[str, Any]):
+        """Cancel the searches of sections whose agent never claimed them (failed, timed out, cancelled)"""
+        for section, agent_name, _, _, _ in AGENT_SECTIONS:
+            prefetched = started.pop(section, None)
+            if prefetched:
+                getattr(agents, agent_name).serpapi.claim(prefetched, ())
+
+    def agent_node(section: str, agent_name: str, rng_name: str, retries: int, searches: bool) -> Node:
+        async def run(inputs: Dict[str, Any], ctx: Dict[str, Any]) -> Any:
+            agent = getattr(agents, agent_name)
+            # BREAKDOWN_FIELDS lists the breakdown fields the agent's analyze() reads: it starts as
+            # soon as those have streamed in, and only they are passed on, so the result does not
+            # depend on how far the rest of the breakdown had streamed when the agent started
+            breakdown = await inputs["breakdown_source"].wait_for(agent.BREAKDOWN_FIELDS)
+            # Claimed once, so a retried attempt does not settle the same searches again
+            prefetched = inputs.get("prefetch", {}).pop(section, None)
+            if prefetched:
+                # Searches the real breakdown also needs are joined in flight; the rest are cancelled
+                agent.serpapi.claim(prefetched, agent.search_requests(breakdown, deep=ctx["deep"]))
+            try:
+                return await agent.analyze(breakdown, ctx["rngs"].get(rng_name), deep=ctx["deep"])
+            finally:
+                # The claimed searches are this agent's now: if it is cancelled (client gone,
+                # budget missed) or fails, they must not keep the shared requests alive
+                for task in (prefetched or {}).values():
+                    task.cancel()
+
+        async def fallback(inputs: Dict[str, Any], ctx: Dict[str, Any]) -> Any:
+            agent = getattr(agents, agent_name)
+            breakdown = await inputs["breakdown_source"].wait_for(agent.BREAKDOWN_FIELDS)
+            return await agent.fallback_analysis(breakdown, ctx["rngs"].get(rng_name))
+
+        return Node(section, run, inputs=("breakdown_source", "prefetch") if searches else ("breakdown_source",),
+                    fallback=fallback, budget_share=BUDGET_SHARES["agents"], retries=retries)
+
+    async def recommendation(inputs: Dict[str, Any], ctx: Dict[str, Any]) -> Dict[str, Any]:
+        return await agents.insight_agent.generate_recommendation(inputs, deep=ctx["deep"])
+
+    async def local_recommendation(inputs: Dict[str, Any], ctx: Dict[str, Any]) -> Dict[str, Any]:
+        return await agents.insight_agent.fallback_recommendation(inputs)
+
+    return DAG([
+        Node("breakdown_source", breakdown_source, fallback=local_breakdown_source, internal=True),
+        # analyze_into() already falls back locally on errors, so only a missed budget is left
+        Node("breakdown", breakdown, inputs=("breakdown_source",), fallback=local_breakdown,
+             budget_share=BUDGET_SHARES["breakdown"]),
+        Node("prefetch", prefetch, fallback=no_prefetch, internal=True, release=release_prefetch),
+        *(agent_node(*entry) for entry in AGENT_SECTIONS),
+        Node("recommendation", recommendation,
+             inputs=("breakdown", *(entry[0] for entry in AGENT_SECTIONS)),
+             fallback=local_recommendation, budget_share=BUDGET_SHARES["insight"], retries=1)
+    ])
@@ -0,0 +1,98 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Tuple, Type
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a dependency whose breaker is open"""
+
+class CircuitBreaker:
+    """Stops calling a dependency after repeated failures, then probes it once in a while
+
+    closed: calls flow. open: calls fail fast with CircuitOpen for reset_timeout seconds.
+    half_open: a single probe call is let through; its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+        self.short_circuited = 0
+        self.times_opened = 0
+
+    @classmethod
+    def from_env(cls, name: str) -> "CircuitBreaker":
+        """Build from <NAME>_BREAKER_THRESHOLD and <NAME>_BREAKER_RESET"""
+        prefix = name.upper()
+        return cls(
+            name,
+            failure_threshold=int(os.getenv(f"{prefix}_BREAKER_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv(f"{prefix}_BREAKER_RESET", "30"))
+        )
+
+    def check(self):
+        """Raise CircuitOpen unless a call may go ahead right now"""
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = "half_open"
+            print(f"🔌 {self.name} circuit half-open, probing")
+        if self.state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return
+        if self.state != "closed":
+            self.short_circuited += 1
+            raise CircuitOpen(f"{self.name} circuit is open")
+
+    @contextmanager
+    def guard(self, ignore: Tuple[Type[BaseException], ...] = ()) -> Iterator[None]:
+        """Fail fast while open; otherwise record the outcome of the wrapped call
+
+        Exceptions in ignore (and cancellation) say nothing about the dependency's health.
+        """
+        self.check()
+        try:
+            yield
+        except ignore:
+            self.release()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        except BaseException:
+            self.release()
+            raise
+        self.record_success()
+
+    def record_success(self):
+        if self.state != "closed":
+            print(f"🔌 {self.name} circuit closed")
+        self.state = "closed"
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+                print(f"🔌 {self.name} circuit open after {self.failures} failures")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def release(self):
+        """The call ended without a verdict (e.g. cancelled); let another probe through"""
+        self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "times_opened": self.times_opened,
+            "short_circuited": self.short_circuited
+        }
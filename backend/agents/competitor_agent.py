@@ -1,26 +1,53 @@
-import requests
 import asyncio
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 import random
 import os
 import hashlib
-import google.generativeai as genai
-import json
-from dotenv import load_dotenv
+from .serpapi_client import SerpAPIClient
+from .gemini_client import GeminiClient
+from .gemini_schemas import COMPETITORS_SCHEMA, Competitor
 
 class CompetitorAgent:
-    def __init__(self):
-        load_dotenv()
-        self.serpapi_key = os.getenv("SERPAPI_KEY")
+    BREAKDOWN_FIELDS = ("industry", "keywords", "business_model", "key_features")
+
+    # India-centric and global competitors by industry
+    KNOWN_COMPETITORS = {
+        "technology": ["Infosys", "TCS", "Wipro", "HCL Technologies", "Tech Mahindra", "Zoho", "Freshworks", "Microsoft", "Google", "Amazon"],
+        "healthcare": ["Practo", "1mg", "PharmEasy", "Netmeds", "Apollo 24/7", "Lybrate", "DocsApp", "Teladoc", "Amwell"],
+        "fintech": ["Paytm", "PhonePe", "Razorpay", "Pine Labs", "Mobikwik", "BharatPe", "CRED", "Stripe", "PayPal"],
+        "logistics": ["Swiggy", "Zomato", "Dunzo", "Porter", "BlackBuck", "Rivigo", "Delhivery", "Blue Dart", "FedEx"],
+        "ecommerce": ["Flipkart", "Amazon India", "Myntra", "Nykaa", "BigBasket", "Grofers", "Meesho", "Shopify"],
+        "electric vehicle": ["Ather Energy", "Ola Electric", "Hero Electric", "Mahindra Electric", "Tata Motors EV", "ChargePoint", "Shell Recharge"],
+        "automotive": ["Tata Motors", "Mahindra", "Maruti Suzuki", "Hyundai India", "Hero MotoCorp", "Bajaj Auto", "TVS Motor"],
+        "energy": ["Reliance Industries", "Adani Green", "Tata Power", "NTPC", "Coal India", "ONGC", "Indian Oil"],
+        "mobility": ["Ola", "Uber India", "Rapido", "Bounce", "Yulu", "Vogo", "Quick Ride", "BlaBlaCar India"],
+        "mapping": ["MapmyIndia", "Google Maps", "Ola Maps", "HERE Technologies", "TomTom", "Garmin"],
+        "education": ["BYJU'S", "Unacademy", "Vedantu", "Toppr", "WhiteHat Jr", "Simplilearn", "UpGrad", "Coursera", "Khan Academy"],
+        "edtech": ["BYJU'S", "Unacademy", "Vedantu", "Toppr", "Doubtnut", "Embibe", "Meritnation", "Khan Academy", "Coursera"],
+        "rural": ["ITC e-Choupal", "Mahindra Agri Solutions", "Tata Kisan Sansar", "Digital Green", "CropIn", "AgroStar"],
+        "agriculture": ["ITC e-Choupal", "Mahindra Agri Solutions", "UPL", "Bayer CropScience", "Syngenta India", "IFFCO"],
+        "tablets": ["Samsung India", "Lenovo India", "Apple India", "Xiaomi India", "Realme", "OnePlus", "Micromax"]
+    }
+
+    def __init__(self, serpapi_client: Optional[SerpAPIClient] = None,
+                 gemini_client: Optional[GeminiClient] = None,
+                 discovery_mode: Optional[str] = None, hedge_deadline: Optional[float] = None,
+                 fused: Optional[bool] = None):
+        self.serpapi = serpapi_client or SerpAPIClient()
         
         # Initialize Gemini API
-        api_key = os.getenv("GEMINI_API_KEY")
-        if api_key:
-            genai.configure(api_key=api_key)
-            self.gemini_model = genai.GenerativeModel('gemini-1.5-flash')
-        else:
+        self.gemini = gemini_client or GeminiClient()
+        if not self.gemini.enabled:
             print("⚠️ GEMINI_API_KEY not found, competitor analysis will use fallback data")
-            self.gemini_model = None
+        
+        # "sequential" tries Gemini, then SerpAPI; "hedged" races them, which can abandon a Gemini
+        # call mid-flight (its quota is still spent), so it is opt-in
+        self.discovery_mode = discovery_mode or os.getenv("COMPETITOR_DISCOVERY_MODE", "sequential")
+        self.hedge_deadline = hedge_deadline if hedge_deadline is not None else float(os.getenv("COMPETITOR_HEDGE_DEADLINE", "6.0"))
+        # The breakdown call already lists competitors (GEMINI_FUSED_BREAKDOWN), so wait for that list too
+        self.fused = fused if fused is not None else os.getenv("GEMINI_FUSED_BREAKDOWN", "false").lower() == "true"
+        if self.fused:
+            self.BREAKDOWN_FIELDS = (*CompetitorAgent.BREAKDOWN_FIELDS, "suggested_competitors")
         
         # Realistic competitor database with actual funding data
         self.competitor_db = {
@@ -106,13 +133,46 @@ class CompetitorAgent:
             "Realme": 200, "OnePlus": 300, "Micromax": 100
         }
 
-    async def analyze(self, breakdown: Dict[str, Any]) -> Dict[str, Any]:
+    async def analyze(self, breakdown: Dict[str, Any], rng: Optional[random.Random] = None,
+                      deep: bool = False) -> Dict[str, Any]:
+        rng = rng or random.Random()
         industry = breakdown.get("industry", "Technology").lower()
         keywords = breakdown.get("keywords", [])
         business_model = breakdown.get("business_model", "")
         
         # Fetch real competitor data
-        competitors = await self._fetch_real_competitors(industry, keywords, business_model)
+        if "suggested_competitors" in breakdown:
+            competitors = await self._use_suggested_competitors(
+                breakdown["suggested_competitors"], industry, keywords, business_model, rng, deep
+            )
+        elif self.discovery_mode == "hedged":
+            competitors = await self._fetch_competitors_hedged(industry, keywords, business_model, rng, deep)
+        else:
+            competitors = await self._fetch_real_competitors(industry, keywords, business_model, rng, deep)
+        
+        return self._build_result(competitors, breakdown)
+
+    def search_requests(self, breakdown: Dict[str, Any], deep: bool = False) -> List[Tuple[Dict[str, Any], str]]:
+        """The SerpAPI searches analyze() issues for this breakdown, as (params, query_type)"""
+        suggested = breakdown.get("suggested_competitors")
+        if suggested is not None and len(suggested) >= 2:
+            # The fused breakdown call already answered
+            return []
+        if suggested is None and self.discovery_mode != "hedged":
+            # Sequential discovery only searches when Gemini comes up short
+            return []
+        industry = breakdown.get("industry", "Technology").lower()
+        return [(self._competitor_params(industry, breakdown.get("keywords", []), deep), "competitors")]
+
+    async def fallback_analysis(self, breakdown: Dict[str, Any], rng: Optional[random.Random] = None) -> Dict[str, Any]:
+        """Curated competitors only, no network calls"""
+        industry = breakdown.get("industry", "Technology").lower()
+        keywords = breakdown.get("keywords", [])
+        
+        competitors = self._get_fallback_competitors(industry, keywords)
+        return self._build_result(competitors, breakdown)
+
+    def _build_result(self, competitors: List[Dict[str, Any]], breakdown: Dict[str, Any]) -> Dict[str, Any]:
         competitive_analysis = self._analyze_competitive_landscape(competitors, breakdown)
         
         return {
@@ -121,13 +181,43 @@ class CompetitorAgent:
             "threat_level": competitive_analysis["threat_level"]
         }
 
-    async def _fetch_real_competitors(self, industry: str, keywords: list, business_model: str) -> List[Dict[str, Any]]:
+    async def _use_suggested_competitors(self, suggested: List[Dict[str, Any]], industry: str, keywords: list,
+                                         business_model: str, rng: random.Random,
+                                         deep: bool = False) -> List[Dict[str, Any]]:
+        """Competitors from the fused breakdown call; Gemini has answered, so only search tops them up"""
+        # Streamed breakdowns hand over the raw JSON, so validate it the same way either path
+        competitors = []
+        for comp in suggested:
+            try:
+                competitors.append(Competitor.model_validate(comp).as_listing())
+            except ValueError:
+                continue  # A malformed entry; the rest of the list is still usable
+        if len(competitors) >= 2:
+            print(f"✅ Found {len(competitors)} competitors via fused Gemini breakdown")
+            return competitors
+        
+        try:
+            if self.serpapi.enabled:
+                print("⚠️ Fused breakdown listed too few competitors, trying SerpAPI...")
+                found = await self._search_competitors(industry, keywords, business_model, rng, deep)
+                merged = list({comp["name"]: comp for comp in [*competitors, *found]}.values())
+                if len(merged) >= 2:
+                    print(f"✅ Merged {len(merged)} competitors from fused breakdown and search")
+                    return merged
+        except Exception as e:
+            print(f"❌ Search failed: {e}, using curated competitors")
+        
+        print("🔄 Using curated competitors for better industry matching")
+        return self._get_fallback_competitors(industry, keywords)
+
+    async def _fetch_real_competitors(self, industry: str, keywords: list, business_model: str,
+                                      rng: random.Random, deep: bool = False) -> List[Dict[str, Any]]:
         """Fetch real competitor data using Gemini AI, SerpAPI, or fallback to curated list"""
         print(f"🔍 Fetching competitors for industry: {industry}, keywords: {keywords}")
         
         # Try Gemini AI first for intelligent competitor analysis
         try:
-            if self.gemini_model:
+            if self.gemini.enabled:
                 print("🤖 Attempting to analyze competitors using Gemini AI...")
                 competitors = await self._analyze_competitors_with_gemini(industry, keywords, business_model)
                 if len(competitors) >= 2:
@@ -142,9 +232,9 @@ class CompetitorAgent:
         
         # Try SerpAPI as secondary option
         try:
-            if self.serpapi_key:
+            if self.serpapi.enabled:
                 print("🔍 Attempting to search for competitors using SerpAPI...")
-                competitors = await self._search_competitors(industry, keywords, business_model)
+                competitors = await self._search_competitors(industry, keywords, business_model, rng, deep)
                 if len(competitors) >= 2:
                     print(f"✅ Found {len(competitors)} competitors via search")
                     return competitors
@@ -159,9 +249,66 @@ class CompetitorAgent:
         print("🔄 Using curated competitors for better industry matching")
         return self._get_fallback_competitors(industry, keywords)
 
+    async def _fetch_competitors_hedged(self, industry: str, keywords: list, business_model: str,
+                                        rng: random.Random, deep: bool = False) -> List[Dict[str, Any]]:
+        """Race Gemini and SerpAPI; first acceptable list wins, partial lists are merged
+
+        Search only counts companies its results actually name; curated padding is added after
+        the race, so it can never beat a real Gemini answer.
+        """
+        print(f"🔍 Racing competitor sources for industry: {industry}, keywords: {keywords}")
+        
+        sources = {}
+        if self.gemini.enabled:
+            sources[asyncio.ensure_future(
+                self._analyze_competitors_with_gemini(industry, keywords, business_model)
+            )] = "Gemini AI"
+        if self.serpapi.enabled:
+            sources[asyncio.ensure_future(
+                self._search_competitors(industry, keywords, business_model, rng, deep, pad=False)
+            )] = "search"
+        
+        partial = []
+        pending = set(sources)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.hedge_deadline
+        try:
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    print(f"⏱️ Competitor sources exceeded {self.hedge_deadline}s deadline")
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        competitors = task.result()
+                    except Exception as e:
+                        print(f"❌ {sources[task]} competitor discovery failed: {e}")
+                        continue
+                    if len(competitors) >= 2:
+                        print(f"✅ Found {len(competitors)} competitors via {sources[task]}")
+                        return competitors
+                    partial.extend(competitors)
+        finally:
+            # Cancel the loser (or both on deadline) so it stops spending quota
+            for task in pending:
+                task.cancel()
+        
+        # Neither source was sufficient alone; merge whatever partial lists arrived
+        merged = list({comp["name"]: comp for comp in partial}.values())
+        if len(merged) >= 2:
+            print(f"✅ Merged {len(merged)} competitors from partial results")
+            return merged
+        if merged:
+            print(f"➕ Topping up {len(merged)} found competitor(s) with well-known industry players")
+            return self._pad_competitors(merged, industry, rng)
+        
+        print("🔄 Using curated competitors for better industry matching")
+        return self._get_fallback_competitors(industry, keywords)
+
     async def _analyze_competitors_with_gemini(self, industry: str, keywords: list, business_model: str) -> List[Dict[str, Any]]:
         """Use Gemini AI to analyze and identify real competitors with funding data"""
-        if not self.gemini_model:
+        if not self.gemini.enabled:
             raise Exception("Gemini model not available")
         
         prompt = f"""
@@ -174,27 +321,8 @@ class CompetitorAgent:
         Please identify 3-5 real, well-known competitors in this space and provide their actual funding data and market share estimates.
         Focus on companies that are direct competitors or operate in similar markets.
         
-        For each competitor, provide:
-        1. Company name (use real company names)
-        2. Total funding raised (in millions USD)
-        3. Estimated market share (as a percentage)
-        4. Brief description of their business model
-        
-        Please respond with a JSON array in this exact format:
-        [
-            {{
-                "name": "Company Name",
-                "funding": 1500,
-                "market_share": 15,
-                "description": "Brief description of what they do"
-            }},
-            {{
-                "name": "Another Company",
-                "funding": 800,
-                "market_share": 8,
-                "description": "Brief description of what they do"
-            }}
-        ]
+        For each competitor, provide its name, total funding raised, estimated market share
+        and a brief description of its business model.
         
         Use real companies with actual funding data. For funding amounts, use the most recent total funding raised.
         For market share, provide realistic estimates based on industry knowledge.
@@ -202,111 +330,61 @@ class CompetitorAgent:
         """
         
         try:
-            response = self.gemini_model.generate_content(prompt)
-            response_text = response.text
-            
-            # Extract JSON from response
-            start_idx = response_text.find('[')
-            end_idx = response_text.rfind(']') + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = response_text[start_idx:end_idx]
-                competitors_data = json.loads(json_str)
+            # The reply is constrained to COMPETITORS_SCHEMA and cached per prompt once validated
+            competitors = await self.gemini.generate_structured(prompt, COMPETITORS_SCHEMA)
+            print(f"🤖 Gemini identified {len(competitors)} competitors")
+            return [comp.as_listing() for comp in competitors]
                 
-                # Validate and clean the data
-                competitors = []
-                for comp in competitors_data:
-                    if isinstance(comp, dict) and 'name' in comp:
-                        # Ensure funding is a number
-                        funding = comp.get('funding', 0)
-                        if isinstance(funding, str):
-                            # Extract number from string
-                            import re
-                            numbers = re.findall(r'\d+', funding)
-                            funding = int(numbers[0]) if numbers else 0
-                        
-                        # Ensure market share is a number
-                        market_share = comp.get('market_share', 0)
-                        if isinstance(market_share, str):
-                            import re
-                            numbers = re.findall(r'\d+', market_share)
-                            market_share = int(numbers[0]) if numbers else 0
-                        
-                        competitors.append({
-                            "name": comp['name'],
-                            "funding": int(funding),
-                            "market_share": int(market_share)
-                        })
-                
-                print(f"🤖 Gemini identified {len(competitors)} competitors")
-                return competitors
-            else:
-                print("❌ Could not extract JSON from Gemini response")
-                raise Exception("Invalid JSON response from Gemini")
-                
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON parsing error: {e}")
-            raise Exception("Failed to parse Gemini response as JSON")
+        except ValueError as e:
+            # The reply did not match the schema (counted by the client)
+            print(f"❌ Gemini competitor reply rejected: {e}")
+            raise Exception("Gemini competitor reply did not match its schema") from e
         except Exception as e:
             print(f"❌ Gemini analysis error: {e}")
             raise e
 
-    async def _search_competitors(self, industry: str, keywords: list, business_model: str) -> List[Dict[str, Any]]:
-        """Search for competitors using SerpAPI"""
-        if not self.serpapi_key:
-            raise Exception("SerpAPI key not available")
-        
+    def _competitor_params(self, industry: str, keywords: list, deep: bool = False) -> Dict[str, Any]:
         # Create search query for competitors
         search_terms = [industry] + keywords[:2]  # Limit keywords
         query = f"{' '.join(search_terms)} companies startups competitors funding"
         
-        params = {
+        return {
             "engine": "google",
             "q": query,
-            "api_key": self.serpapi_key,
-            "num": 8
+            "num": 15 if deep else 8
         }
+
+    async def _search_competitors(self, industry: str, keywords: list, business_model: str,
+                                  rng: random.Random, deep: bool = False, pad: bool = True) -> List[Dict[str, Any]]:
+        """Search for competitors using SerpAPI (without pad, only companies the results name)"""
+        if not self.serpapi.enabled:
+            raise Exception("SerpAPI key not available")
         
         try:
-            response = requests.get("https://serpapi.com/search", params=params, timeout=10)
-            data = response.json()
+            data = await self.serpapi.search(self._competitor_params(industry, keywords, deep), query_type="competitors")
             
             # Extract competitor information
-            competitors = self._extract_competitor_info(data, industry)
+            competitors = self._extract_competitor_info(data, industry, rng, scan=10 if deep else 5, pad=pad)
             
             return competitors
         except Exception as e:
             print(f"Competitor search failed: {e}")
             raise e
 
-    def _extract_competitor_info(self, search_data: dict, industry: str) -> List[Dict[str, Any]]:
-        """Extract competitor information from search results with better company names"""
+    def _extract_competitor_info(self, search_data: dict, industry: str, rng: random.Random,
+                                 scan: int = 5, pad: bool = True) -> List[Dict[str, Any]]:
+        """Extract competitor information from search results with better company names
+
+        Without pad, only companies actually named in the results are returned.
+        """
         competitors = []
         organic_results = search_data.get("organic_results", [])
         
         import re
-        
-        # India-centric and global competitors by industry
-        known_competitors = {
-            "technology": ["Infosys", "TCS", "Wipro", "HCL Technologies", "Tech Mahindra", "Zoho", "Freshworks", "Microsoft", "Google", "Amazon"],
-            "healthcare": ["Practo", "1mg", "PharmEasy", "Netmeds", "Apollo 24/7", "Lybrate", "DocsApp", "Teladoc", "Amwell"],
-            "fintech": ["Paytm", "PhonePe", "Razorpay", "Pine Labs", "Mobikwik", "BharatPe", "CRED", "Stripe", "PayPal"],
-            "logistics": ["Swiggy", "Zomato", "Dunzo", "Porter", "BlackBuck", "Rivigo", "Delhivery", "Blue Dart", "FedEx"],
-            "ecommerce": ["Flipkart", "Amazon India", "Myntra", "Nykaa", "BigBasket", "Grofers", "Meesho", "Shopify"],
-            "electric vehicle": ["Ather Energy", "Ola Electric", "Hero Electric", "Mahindra Electric", "Tata Motors EV", "ChargePoint", "Shell Recharge"],
-            "automotive": ["Tata Motors", "Mahindra", "Maruti Suzuki", "Hyundai India", "Hero MotoCorp", "Bajaj Auto", "TVS Motor"],
-            "energy": ["Reliance Industries", "Adani Green", "Tata Power", "NTPC", "Coal India", "ONGC", "Indian Oil"],
-            "mobility": ["Ola", "Uber India", "Rapido", "Bounce", "Yulu", "Vogo", "Quick Ride", "BlaBlaCar India"],
-            "mapping": ["MapmyIndia", "Google Maps", "Ola Maps", "HERE Technologies", "TomTom", "Garmin"],
-            "education": ["BYJU'S", "Unacademy", "Vedantu", "Toppr", "WhiteHat Jr", "Simplilearn", "UpGrad", "Coursera", "Khan Academy"],
-            "edtech": ["BYJU'S", "Unacademy", "Vedantu", "Toppr", "Doubtnut", "Embibe", "Meritnation", "Khan Academy", "Coursera"],
-            "rural": ["ITC e-Choupal", "Mahindra Agri Solutions", "Tata Kisan Sansar", "Digital Green", "CropIn", "AgroStar"],
-            "agriculture": ["ITC e-Choupal", "Mahindra Agri Solutions", "UPL", "Bayer CropScience", "Syngenta India", "IFFCO"],
-            "tablets": ["Samsung India", "Lenovo India", "Apple India", "Xiaomi India", "Realme", "OnePlus", "Micromax"]
-        }
+        known_competitors = self.KNOWN_COMPETITORS
         
         # First try to extract real company names from search results
-        for result in organic_results[:5]:
+        for result in organic_results[:scan]:
             snippet = result.get("snippet", "")
             title = result.get("title", "")
             text = f"{title} {snippet}"
@@ -345,6 +423,15 @@ class CompetitorAgent:
             if len(competitors) >= 4:
                 break
         
+        return self._pad_competitors(competitors, industry, rng) if pad else competitors
+
+    def _pad_competitors(self, competitors: List[Dict[str, Any]], industry: str,
+                         rng: random.Random) -> List[Dict[str, Any]]:
+        """Top a list up to 3 entries with well-known companies of the industry"""
+        known_competitors = self.KNOWN_COMPETITORS
+        industry_competitors = known_competitors["technology"]
+        competitors = list(competitors)
+        
         # If we still don't have enough, add some realistic competitors
         if len(competitors) < 3:
             # Better industry matching for competitors
@@ -381,11 +468,10 @@ class CompetitorAgent:
                 industry_competitors = known_competitors["rural"]
             
             # Add random competitors from the industry list
-            import random
             remaining_competitors = [c for c in industry_competitors if c not in [comp["name"] for comp in competitors]]
             
             while len(competitors) < 3 and remaining_competitors:
-                comp = random.choice(remaining_competitors)
+                comp = rng.choice(remaining_competitors)
                 remaining_competitors.remove(comp)
                 
                 funding = self._estimate_company_funding(comp, industry)
@@ -401,7 +487,6 @@ class CompetitorAgent:
         if len(competitors) == 0:
             print(f"No competitors found via search, using industry defaults for: {industry}")
             # Force add 3 competitors from the correct industry
-            import random
             for i in range(3):
                 if i < len(industry_competitors):
                     comp = industry_competitors[i]
@@ -426,7 +511,7 @@ class CompetitorAgent:
         # For companies not in our database, use industry-based estimation
         # Create a consistent seed based on company name for reproducible results
         seed = int(hashlib.md5(company.encode()).hexdigest()[:8], 16)
-        random.seed(seed)
+        rng = random.Random(seed)
         
         # Industry-based funding estimation (in millions USD)
         industry_funding_ranges = {
@@ -458,10 +543,7 @@ class CompetitorAgent:
         
         # Generate funding within the range with some variation
         min_funding, max_funding = funding_range
-        funding = random.randint(min_funding, max_funding)
-        
-        # Reset random seed
-        random.seed()
+        funding = rng.randint(min_funding, max_funding)
         return float(funding)
 
     def _estimate_market_share(self, funding: float, industry: str) -> int:
@@ -469,21 +551,21 @@ class CompetitorAgent:
         
         # Create consistent seed for reproducible results
         seed = int(hashlib.md5(f"{funding}_{industry}".encode()).hexdigest()[:8], 16)
-        random.seed(seed)
+        rng = random.Random(seed)
         
         # Base market share calculation based on funding tiers
         if funding > 2000:  # > $2B - Market leaders
-            base_share = random.randint(15, 35)
+            base_share = rng.randint(15, 35)
         elif funding > 1000:  # > $1B - Major players
-            base_share = random.randint(8, 20)
+            base_share = rng.randint(8, 20)
         elif funding > 500:  # > $500M - Established players
-            base_share = random.randint(4, 12)
+            base_share = rng.randint(4, 12)
         elif funding > 200:  # > $200M - Growing companies
-            base_share = random.randint(2, 8)
+            base_share = rng.randint(2, 8)
         elif funding > 50:   # > $50M - Emerging players
-            base_share = random.randint(1, 5)
+            base_share = rng.randint(1, 5)
         else:  # < $50M - Small players
-            base_share = random.randint(1, 3)
+            base_share = rng.randint(1, 3)
         
         # Industry-specific market concentration factors
         industry_lower = industry.lower()
@@ -491,25 +573,22 @@ class CompetitorAgent:
         
         # High concentration industries (few dominant players)
         if any(term in industry_lower for term in ["automotive", "energy", "electric vehicle"]):
-            concentration_factor = random.uniform(1.2, 1.8)
+            concentration_factor = rng.uniform(1.2, 1.8)
         # Medium concentration
         elif any(term in industry_lower for term in ["fintech", "healthcare", "logistics"]):
-            concentration_factor = random.uniform(0.9, 1.3)
+            concentration_factor = rng.uniform(0.9, 1.3)
         # Low concentration (highly fragmented)
         elif any(term in industry_lower for term in ["education", "edtech", "technology", "software", "saas"]):
-            concentration_factor = random.uniform(0.4, 0.8)
+            concentration_factor = rng.uniform(0.4, 0.8)
         # Very low concentration
         elif any(term in industry_lower for term in ["rural", "agriculture"]):
-            concentration_factor = random.uniform(0.3, 0.6)
+            concentration_factor = rng.uniform(0.3, 0.6)
         
         # Apply concentration factor
         adjusted_share = int(base_share * concentration_factor)
         
         # Ensure realistic bounds (1% to 40% max)
         final_share = max(1, min(adjusted_share, 40))
-        
-        # Reset random seed
-        random.seed()
         return final_share
 
     def _get_fallback_competitors(self, industry: str, keywords: list) -> List[Dict[str, Any]]:
@@ -588,7 +667,6 @@ class CompetitorAgent:
         
         # Create competitor objects
         competitors = []
-        import random
         for i, comp in enumerate(industry_competitors[:3]):
             funding = self._estimate_company_funding(comp, industry)
             market_share = self._estimate_market_share(funding, industry)
@@ -0,0 +1,185 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from .deadline import Deadline
+
+# Node callables are awaited with (outputs of the node's inputs, per-run context)
+NodeFn = Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[Any]]
+
+# Awaited with (node_name, output) as each node resolves
+ResultCallback = Callable[[str, Any], Awaitable[None]]
+
+class Node:
+    """One step of a DAG: what it needs, how to compute it, and what to use if that fails"""
+
+    def __init__(self, name: str, run: NodeFn, inputs: Iterable[str] = (),
+                 fallback: Optional[NodeFn] = None, budget_share: Optional[float] = None,
+                 retries: int = 0, internal: bool = False,
+                 release: Optional[Callable[[Any], None]] = None):
+        self.name = name
+        self.run = run
+        self.inputs = tuple(inputs)
+        self.fallback = fallback
+        # Fraction of the deadline's remaining budget, taken when the node starts
+        self.budget_share = budget_share
+        # Extra attempts after an exception; a missed budget goes straight to the fallback
+        self.retries = retries
+        # Internal nodes feed other nodes only and are never handed to on_result
+        self.internal = internal
+        # Called with the node's output when the run ends, however it ends, to clean up work
+        # the output started that no dependant took over (e.g. speculative requests)
+        self.release = release
+
+class DAGRun:
+    """Outputs of one execution, which nodes fell back, and when each node ran
+
+    Doubles as a checkpoint: passing it back to DAG.run resumes from the nodes it already holds.
+    """
+
+    def __init__(self):
+        self.values: Dict[str, Any] = {}
+        self.degraded: List[str] = []
+        self.timings: Dict[str, Dict[str, Any]] = {}
+
+    def describe_timings(self) -> str:
+        return ", ".join(
+            f"{name} {timing['seconds']:.2f}s@{timing['start']:.2f}s ({timing['status']})"
+            for name, timing in sorted(self.timings.items(), key=lambda item: item[1]["start"])
+        )
+
+class DAG:
+    """Runs every node as soon as all of its inputs have resolved
+
+    Nodes must be declared after their inputs, which also rules out cycles.
+    """
+
+    def __init__(self, nodes: Iterable[Node]):
+        self.nodes: Dict[str, Node] = {}
+        for node in nodes:
+            unknown = [name for name in node.inputs if name not in self.nodes]
+            if unknown:
+                raise ValueError(f"Node {node.name} depends on undeclared nodes: {unknown}")
+            if node.name in self.nodes:
+                raise ValueError(f"Duplicate node: {node.name}")
+            self.nodes[node.name] = node
+        self._stats = {
+            name: {"runs": 0, "fallbacks": 0, "retries": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            for name in self.nodes
+        }
+
+    def closure(self, targets: Optional[Iterable[str]] = None) -> Set[str]:
+        """The targets plus everything they transitively depend on; None means every node"""
+        pending = list(self.nodes if targets is None else targets)
+        needed: Set[str] = set()
+        while pending:
+            name = pending.pop()
+            if name not in self.nodes:
+                raise ValueError(f"Unknown node: {name}")
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.nodes[name].inputs)
+        return needed
+
+    async def run(self, context: Dict[str, Any], targets: Optional[Iterable[str]] = None,
+                  deadline: Optional[Deadline] = None,
+                  on_result: Optional[ResultCallback] = None, local_only: bool = False,
+                  resume: Optional[DAGRun] = None) -> DAGRun:
+        """Execute the closure of targets, each node once all of its inputs have resolved
+
+        local_only runs each node's fallback directly (no network, nothing marked degraded).
+        resume continues an earlier, failed run of the same request: nodes it completed are
+        reused as-is (and not re-emitted), and new outputs are checkpointed into it.
+        """
+        needed = self.closure(targets)
+        dag_run = resume or DAGRun()
+        started = time.monotonic()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def execute(node: Node) -> Any:
+            if node.inputs:
+                await asyncio.gather(*(tasks[name] for name in node.inputs))
+            if node.name in dag_run.values:
+                return dag_run.values[node.name]
+            inputs = {name: dag_run.values[name] for name in node.inputs}
+
+            node_started = time.monotonic()
+            if local_only:
+                value, status = await node.fallback(inputs, context), "local"
+            else:
+                value, status = await self._attempt(node, inputs, context, deadline)
+
+            self._record(node.name, dag_run, status, node_started - started, time.monotonic() - node_started)
+            dag_run.values[node.name] = value
+            # Hand each output to streaming callers the moment it resolves
+            if on_result and not node.internal:
+                await on_result(node.name, value)
+            return value
+
+        # Declaration order is a topological order, so every input's task exists already
+        for name, node in self.nodes.items():
+            if name in needed:
+                tasks[name] = asyncio.create_task(execute(node))
+        try:
+            # Independent branches run to completion even if one fails, so their outputs
+            # are checkpointed; only the failed node and its dependants are left to redo
+            outcomes = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        finally:
+            # Cancelled from outside: stop every node still running
+            for task in tasks.values():
+                task.cancel()
+            for name in needed:
+                node = self.nodes[name]
+                if node.release and name in dag_run.values:
+                    node.release(dag_run.values[name])
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+        return dag_run
+
+    async def _attempt(self, node: Node, inputs: Dict[str, Any], context: Dict[str, Any],
+                       deadline: Optional[Deadline]) -> Tuple[Any, str]:
+        """Run a node within its budget, retrying exceptions, else fall back"""
+        for attempt in range(node.retries + 1):
+            timeout = deadline.share(node.budget_share) if deadline and node.budget_share else None
+            try:
+                coro = node.run(inputs, context)
+                value = await asyncio.wait_for(coro, timeout) if timeout is not None else await coro
+                return value, "ok"
+            except asyncio.TimeoutError:
+                if node.fallback is None:
+                    raise
+                print(f"   ⏱️ {node.name} missed its {timeout:.2f}s budget, using local fallback")
+                return await node.fallback(inputs, context), "timeout"
+            except Exception as e:
+                if attempt < node.retries:
+                    self._stats[node.name]["retries"] += 1
+                    print(f"   🔁 {node.name} failed ({e}), retrying")
+                    continue
+                if node.fallback is None:
+                    raise
+                print(f"   ⚠️ {node.name} failed ({e}), using local fallback")
+                return await node.fallback(inputs, context), "failed"
+
+    def _record(self, name: str, dag_run: DAGRun, status: str, start: float, seconds: float):
+        dag_run.timings[name] = {"start": round(start, 3), "seconds": round(seconds, 3), "status": status}
+        if status in ("timeout", "failed"):
+            dag_run.degraded.append(name)
+        if status == "local":
+            return
+        stats = self._stats[name]
+        stats["runs"] += 1
+        stats["fallbacks"] += status in ("timeout", "failed")
+        stats["total_seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "runs": stats["runs"],
+                "fallbacks": stats["fallbacks"],
+                "retries": stats["retries"],
+                "avg_seconds": round(stats["total_seconds"] / stats["runs"], 3) if stats["runs"] else 0.0,
+                "max_seconds": round(stats["max_seconds"], 3)
+            }
+            for name, stats in self._stats.items()
+        }
@@ -0,0 +1,24 @@
+import time
+from typing import Optional
+
+class Deadline:
+    """Request-level time budget that each analysis stage draws its share from"""
+
+    def __init__(self, budget_seconds: float):
+        self.budget = budget_seconds
+        self.expires_at = time.monotonic() + budget_seconds
+
+    @classmethod
+    def from_ms(cls, budget_ms: Optional[float]) -> Optional["Deadline"]:
+        return cls(budget_ms / 1000.0) if budget_ms else None
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def share(self, fraction: float) -> float:
+        """Timeout for a stage allowed `fraction` of whatever budget is left"""
+        return self.remaining() * fraction
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
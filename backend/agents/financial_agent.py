@@ -1,8 +1,10 @@
 import asyncio
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import random
 
 class FinancialAgent:
+    BREAKDOWN_FIELDS = ("industry", "business_model", "geographic_scope")
+
     def __init__(self):
         # Industry-specific financial benchmarks
         self.financial_benchmarks = {
@@ -38,16 +40,23 @@ class FinancialAgent:
             }
         }
 
-    async def analyze(self, breakdown: Dict[str, Any]) -> Dict[str, Any]:
+    async def analyze(self, breakdown: Dict[str, Any], rng: Optional[random.Random] = None,
+                      deep: bool = False) -> Dict[str, Any]:
+        # Projections come from local benchmarks, so deep mode has nothing extra to fetch
+        rng = rng or random.Random()
         industry = breakdown.get("industry", "Technology").lower()
         business_model = breakdown.get("business_model", "")
         geographic_scope = breakdown.get("geographic_scope", "National")
         
         benchmarks = self._get_financial_benchmarks(industry)
-        projections = self._calculate_projections(benchmarks, business_model, geographic_scope)
+        projections = self._calculate_projections(benchmarks, business_model, geographic_scope, rng)
         
         return projections
 
+    async def fallback_analysis(self, breakdown: Dict[str, Any], rng: Optional[random.Random] = None) -> Dict[str, Any]:
+        """Projections are benchmark-based and already local, so this is the normal path"""
+        return await self.analyze(breakdown, rng)
+
     def _get_financial_benchmarks(self, industry: str) -> Dict[str, Any]:
         if any(term in industry for term in ["logistics", "delivery", "transport"]):
             return self.financial_benchmarks["logistics"]
@@ -60,52 +69,53 @@ class FinancialAgent:
         else:
             return self.financial_benchmarks["default"]
 
-    def _calculate_projections(self, benchmarks: Dict, business_model: str, scope: str) -> Dict[str, Any]:
+    def _calculate_projections(self, benchmarks: Dict, business_model: str, scope: str,
+                              rng: random.Random) -> Dict[str, Any]:
         # More dynamic base revenue calculation
         base_revenue = self._calculate_base_revenue(business_model, scope)
         
         # Adjust based on business model complexity
         if "marketplace" in business_model.lower() or "platform" in business_model.lower():
-            base_revenue *= random.uniform(1.3, 1.8)  # Platform businesses scale better
+            base_revenue *= rng.uniform(1.3, 1.8)  # Platform businesses scale better
         elif "saas" in business_model.lower() or "subscription" in business_model.lower():
-            base_revenue *= random.uniform(1.1, 1.5)  # Recurring revenue premium
+            base_revenue *= rng.uniform(1.1, 1.5)  # Recurring revenue premium
         elif "ai" in business_model.lower() or "automation" in business_model.lower():
-            base_revenue *= random.uniform(1.2, 1.6)  # AI premium
+            base_revenue *= rng.uniform(1.2, 1.6)  # AI premium
         elif "hardware" in business_model.lower():
-            base_revenue *= random.uniform(0.8, 1.2)  # Hardware has different economics
+            base_revenue *= rng.uniform(0.8, 1.2)  # Hardware has different economics
         
         # Adjust based on geographic scope with more variation
         scope_multipliers = {
-            "global": random.uniform(1.8, 2.5),
-            "national": random.uniform(0.9, 1.2),
-            "regional": random.uniform(0.5, 0.8),
-            "local": random.uniform(0.2, 0.5)
+            "global": rng.uniform(1.8, 2.5),
+            "national": rng.uniform(0.9, 1.2),
+            "regional": rng.uniform(0.5, 0.8),
+            "local": rng.uniform(0.2, 0.5)
         }
         scope_multiplier = scope_multipliers.get(scope.lower(), 1.0)
         base_revenue *= scope_multiplier
         
         # Add some randomness to make each analysis unique
-        base_revenue *= random.uniform(0.8, 1.3)
+        base_revenue *= rng.uniform(0.8, 1.3)
         
         # Calculate other metrics
         revenue_potential = round(base_revenue, 1)
-        funding_required = round(revenue_potential * benchmarks["funding_ratio"] * random.uniform(0.8, 1.4), 1)
+        funding_required = round(revenue_potential * benchmarks["funding_ratio"] * rng.uniform(0.8, 1.4), 1)
         break_even_timeline = benchmarks["break_even_months"]
-        roi_projection = random.randint(*benchmarks["roi_range"])
+        roi_projection = rng.randint(*benchmarks["roi_range"])
         
         # More dynamic break-even calculation
         if funding_required > 150:  # Very high funding requirement
-            break_even_timeline += random.randint(8, 12)
+            break_even_timeline += rng.randint(8, 12)
         elif funding_required > 75:  # High funding requirement
-            break_even_timeline += random.randint(3, 8)
+            break_even_timeline += rng.randint(3, 8)
         elif funding_required < 25:  # Low funding requirement
-            break_even_timeline -= random.randint(2, 6)
+            break_even_timeline -= rng.randint(2, 6)
         
         # Adjust based on business model
         if "marketplace" in business_model.lower():
-            break_even_timeline += random.randint(3, 8)  # Network effects take time
+            break_even_timeline += rng.randint(3, 8)  # Network effects take time
         elif "saas" in business_model.lower():
-            break_even_timeline -= random.randint(1, 4)  # Faster to break even
+            break_even_timeline -= rng.randint(1, 4)  # Faster to break even
         
         return {
             "revenue_potential": revenue_potential,
@@ -116,65 +126,64 @@ class FinancialAgent:
 
     def _calculate_base_revenue(self, business_model: str, scope: str) -> float:
         """Calculate base revenue with more realistic variation based on business model"""
-        import random
         import hashlib
         
         # Create consistent seed based on business model for reproducible but varied results
         model_seed = int(hashlib.md5(business_model.encode()).hexdigest()[:8], 16)
-        random.seed(model_seed)
+        rng = random.Random(model_seed)
         
         # More realistic revenue ranges based on actual business model characteristics
         if "marketplace" in business_model.lower() or "platform" in business_model.lower():
             # Platforms have high variability - can be huge or struggle
             revenue_tiers = [
-                (0.2, random.uniform(20, 80)),     # 20% chance: struggling platforms
-                (0.4, random.uniform(80, 300)),    # 40% chance: moderate success
-                (0.3, random.uniform(300, 800)),   # 30% chance: successful platforms
-                (0.1, random.uniform(800, 2000))   # 10% chance: unicorn platforms
+                (0.2, rng.uniform(20, 80)),     # 20% chance: struggling platforms
+                (0.4, rng.uniform(80, 300)),    # 40% chance: moderate success
+                (0.3, rng.uniform(300, 800)),   # 30% chance: successful platforms
+                (0.1, rng.uniform(800, 2000))   # 10% chance: unicorn platforms
             ]
         elif "saas" in business_model.lower() or "subscription" in business_model.lower():
             # SaaS has more predictable but varied growth
             revenue_tiers = [
-                (0.3, random.uniform(10, 50)),     # 30% chance: small SaaS
-                (0.4, random.uniform(50, 200)),    # 40% chance: mid-market SaaS
-                (0.2, random.uniform(200, 500)),   # 20% chance: enterprise SaaS
-                (0.1, random.uniform(500, 1200))   # 10% chance: major SaaS
+                (0.3, rng.uniform(10, 50)),     # 30% chance: small SaaS
+                (0.4, rng.uniform(50, 200)),    # 40% chance: mid-market SaaS
+                (0.2, rng.uniform(200, 500)),   # 20% chance: enterprise SaaS
+                (0.1, rng.uniform(500, 1200))   # 10% chance: major SaaS
             ]
         elif "hardware" in business_model.lower() or "product" in business_model.lower():
             # Hardware requires significant capital and volume
             revenue_tiers = [
-                (0.4, random.uniform(50, 150)),    # 40% chance: niche hardware
-                (0.3, random.uniform(150, 400)),   # 30% chance: moderate volume
-                (0.2, random.uniform(400, 800)),   # 20% chance: mass market
-                (0.1, random.uniform(800, 1500))   # 10% chance: major manufacturer
+                (0.4, rng.uniform(50, 150)),    # 40% chance: niche hardware
+                (0.3, rng.uniform(150, 400)),   # 30% chance: moderate volume
+                (0.2, rng.uniform(400, 800)),   # 20% chance: mass market
+                (0.1, rng.uniform(800, 1500))   # 10% chance: major manufacturer
             ]
         elif "service" in business_model.lower() or "consulting" in business_model.lower():
             # Service businesses are more limited by human capital
             revenue_tiers = [
-                (0.5, random.uniform(5, 30)),      # 50% chance: small service business
-                (0.3, random.uniform(30, 100)),    # 30% chance: growing service firm
-                (0.15, random.uniform(100, 300)),  # 15% chance: established firm
-                (0.05, random.uniform(300, 600))   # 5% chance: major consultancy
+                (0.5, rng.uniform(5, 30)),      # 50% chance: small service business
+                (0.3, rng.uniform(30, 100)),    # 30% chance: growing service firm
+                (0.15, rng.uniform(100, 300)),  # 15% chance: established firm
+                (0.05, rng.uniform(300, 600))   # 5% chance: major consultancy
             ]
         elif "ai" in business_model.lower() or "automation" in business_model.lower():
             # AI businesses have high potential but uncertain outcomes
             revenue_tiers = [
-                (0.3, random.uniform(15, 60)),     # 30% chance: early AI startup
-                (0.4, random.uniform(60, 250)),    # 40% chance: growing AI company
-                (0.2, random.uniform(250, 600)),   # 20% chance: successful AI platform
-                (0.1, random.uniform(600, 1500))   # 10% chance: AI unicorn
+                (0.3, rng.uniform(15, 60)),     # 30% chance: early AI startup
+                (0.4, rng.uniform(60, 250)),    # 40% chance: growing AI company
+                (0.2, rng.uniform(250, 600)),   # 20% chance: successful AI platform
+                (0.1, rng.uniform(600, 1500))   # 10% chance: AI unicorn
             ]
         else:
             # General technology business
             revenue_tiers = [
-                (0.3, random.uniform(25, 100)),    # 30% chance: small tech business
-                (0.4, random.uniform(100, 350)),   # 40% chance: growing tech company
-                (0.2, random.uniform(350, 700)),   # 20% chance: successful tech firm
-                (0.1, random.uniform(700, 1200))   # 10% chance: major tech company
+                (0.3, rng.uniform(25, 100)),    # 30% chance: small tech business
+                (0.4, rng.uniform(100, 350)),   # 40% chance: growing tech company
+                (0.2, rng.uniform(350, 700)),   # 20% chance: successful tech firm
+                (0.1, rng.uniform(700, 1200))   # 10% chance: major tech company
             ]
         
         # Select revenue based on probability distribution
-        rand_val = random.random()
+        rand_val = rng.random()
         cumulative = 0
         revenue = 100  # Default fallback
         
@@ -184,6 +193,4 @@ class FinancialAgent:
                 revenue = revenue_val
                 break
         
-        # Reset random seed
-        random.seed()
         return revenue
\ No newline at end of file
@@ -0,0 +1,92 @@
+import asyncio
+import copy
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from .disk_cache import DiskCache
+
+class GeminiCache:
+    """Two-tier cache for Gemini completions: an in-process LRU over an on-disk store
+
+    Entries are content-addressed by model name + prompt hash and hold the raw
+    completion text plus, once an agent has parsed it, the parsed JSON payload.
+    """
+
+    def __init__(self, disk: Optional[DiskCache] = None, ttl: float = 3 * 24 * 3600,
+                 max_memory_entries: int = 256):
+        self.disk = disk
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model_name: str, prompt: str, schema_name: Optional[str] = None) -> str:
+        # Schema-constrained replies are keyed apart from free-text replies to the same prompt
+        material = f"{model_name}\0{prompt}" if schema_name is None else f"{model_name}\0{schema_name}\0{prompt}"
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return {"text": ..., "parsed"?: ...} for key, or None"""
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.time():
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                # Callers may mutate what they get back; keep the cached copy pristine
+                return copy.deepcopy(value)
+            del self._memory[key]
+
+        if self.disk:
+            entry = await asyncio.to_thread(self.disk.get_with_expiry, key)
+            if entry is not None:
+                value, expires_at = entry
+                self.disk_hits += 1
+                # Promoted with the disk entry's remaining lifetime, not a fresh TTL
+                self._remember(key, copy.deepcopy(value), expires_at)
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        self._remember(key, copy.deepcopy(value))
+        if self.disk:
+            await asyncio.to_thread(self.disk.set, key, value, self.ttl)
+
+    async def invalidate(self, key: str):
+        self._memory.pop(key, None)
+        if self.disk:
+            await asyncio.to_thread(self.disk.invalidate, key)
+
+    async def clear(self):
+        self._memory.clear()
+        if self.disk:
+            await asyncio.to_thread(self.disk.clear)
+
+    def _remember(self, key: str, value: Dict[str, Any], expires_at: Optional[float] = None):
+        self._memory[key] = (expires_at if expires_at is not None else time.time() + self.ttl, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+            "disk": self.disk.stats() if self.disk else None
+        }
+
+    def close(self):
+        if self.disk:
+            self.disk.close()
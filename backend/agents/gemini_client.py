@@ -0,0 +1,217 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Optional, TypeVar
+import google.generativeai as genai
+from google.api_core.exceptions import TooManyRequests
+from .settings import load_environment
+from .gemini_cache import GeminiCache
+from .gemini_schemas import ResponseSchema
+from .rate_governor import RateGovernor, RateLimited, QueueTimeout
+from .circuit_breaker import CircuitBreaker
+
+T = TypeVar("T")
+
+class GeminiClient:
+    """Shared Gemini client that keeps blocking SDK calls off the event loop"""
+
+    def __init__(self, model_name: str = 'gemini-1.5-flash', api_key: Optional[str] = None,
+                 max_concurrency: Optional[int] = None, cache: Optional[GeminiCache] = None,
+                 governor: Optional[RateGovernor] = None, breaker: Optional[CircuitBreaker] = None):
+        load_environment()
+        api_key = api_key if api_key is not None else os.getenv("GEMINI_API_KEY")
+        self.model_name = model_name
+        self.model = None
+        if api_key:
+            genai.configure(api_key=api_key)
+            self.model = genai.GenerativeModel(model_name)
+
+        # Every call queues on the governor (cheap, cancellable) for a concurrency slot and a
+        # per-minute token instead of piling up inside the executor queue
+        self.governor = governor or RateGovernor.from_env(
+            "gemini", requests_per_minute=300, max_concurrency=max_concurrency or 8, queue_timeout=30
+        )
+        self.max_concurrency = self.governor.max_concurrency
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="gemini")
+        # While Gemini keeps failing, calls raise CircuitOpen at once and agents use their fallbacks
+        self.breaker = breaker or CircuitBreaker.from_env("gemini")
+        self.cache = cache
+        # Upper bound on a single SDK call, which is also how long an abandoned call can hold a thread
+        self.request_timeout = float(os.getenv("GEMINI_REQUEST_TIMEOUT", "60"))
+        self.abandoned = 0
+        # Schema-constrained replies that still failed validation
+        self.parse_failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.model is not None
+
+    async def generate(self, prompt: str) -> str:
+        """Generate a completion and return its text, served from cache when possible"""
+        cache_key = GeminiCache.key(self.model_name, prompt)
+        if self.cache:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return cached["text"]
+
+        text = await self._generate_uncached(prompt)
+        if self.cache:
+            await self.cache.set(cache_key, {"text": text})
+        return text
+
+    async def generate_structured(self, prompt: str, schema: ResponseSchema[T]) -> T:
+        """Generate JSON constrained to schema and validate it straight into the schema's type
+
+        The validated payload is cached. A reply that still fails validation raises ValueError,
+        is counted in parse_failures and is never cached.
+        """
+        cache_key = GeminiCache.key(self.model_name, prompt, schema.name)
+        cached = await self.cache.get(cache_key) if self.cache else None
+        if cached is not None and "parsed" in cached:
+            return schema.load(cached["parsed"])
+
+        text = await self._generate_uncached(prompt, schema.generation_config)
+        parsed = self._parse(schema, text)
+        if self.cache:
+            await self.cache.set(cache_key, {"text": text, "parsed": schema.dump(parsed)})
+        return parsed
+
+    async def generate_stream(self, prompt: str, schema: Optional[ResponseSchema] = None) -> AsyncIterator[str]:
+        """Yield the completion text as Gemini produces it; a cached completion arrives in one piece
+
+        With schema the reply is constrained to it, and validated once the stream ends: a
+        mismatch raises ValueError after the last chunk and keeps the reply out of the cache.
+        """
+        cache_key = GeminiCache.key(self.model_name, prompt, schema.name if schema else None)
+        cached = await self.cache.get(cache_key) if self.cache else None
+        if cached is not None:
+            yield cached["text"]
+            return
+
+        chunks = []
+        async for chunk in self._stream_uncached(prompt, schema.generation_config if schema else None):
+            chunks.append(chunk)
+            yield chunk
+        # Same key as generate()/generate_structured(): a streamed reply answers later blocking calls too
+        text = "".join(chunks)
+        entry = {"text": text, "parsed": schema.dump(self._parse(schema, text))} if schema else {"text": text}
+        if self.cache:
+            await self.cache.set(cache_key, entry)
+
+    def _parse(self, schema: ResponseSchema[T], text: str) -> T:
+        try:
+            return schema.parse(text)
+        except ValueError as e:
+            self.parse_failures += 1
+            # First line only, e.g. "3 validation errors for Breakdown"
+            raise ValueError(f"Gemini {schema.name} reply does not match its schema: {str(e).splitlines()[0]}") from e
+
+    async def _stream_uncached(self, prompt: str,
+                               generation_config: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """Iterate the SDK's streaming response on a worker thread, handing chunks to the loop
+
+        Unlike a blocking call, a stream can be abandoned: the thread stops at the next chunk.
+        """
+        if not self.model:
+            raise Exception("Gemini model not available")
+
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def handoff(item):
+            try:
+                loop.call_soon_threadsafe(chunks.put_nowait, item)
+            except RuntimeError:
+                pass  # Loop already closed at shutdown
+
+        def produce():
+            try:
+                response = self.model.generate_content(
+                    prompt, stream=True, generation_config=generation_config,
+                    request_options={"timeout": self.request_timeout}
+                )
+                for chunk in response:
+                    if stop.is_set():
+                        return
+                    handoff(("chunk", chunk.text))
+                handoff(("end", None))
+            except Exception as e:
+                handoff(("error", e))
+
+        with self.breaker.guard(ignore=(QueueTimeout,)):
+            await self.governor.acquire()
+            future = self._submit(produce)
+            try:
+                while True:
+                    kind, value = await chunks.get()
+                    if kind == "end":
+                        break
+                    if isinstance(value, TooManyRequests):
+                        self.governor.backoff()
+                        raise RateLimited(f"Gemini quota exhausted: {value}") from value
+                    if kind == "error":
+                        raise value
+                    yield value
+            finally:
+                stop.set()
+                future.cancel()
+
+    async def _generate_uncached(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> str:
+        """Run the blocking SDK call on the bounded executor, paced by the rate governor"""
+        if not self.model:
+            raise Exception("Gemini model not available")
+
+        with self.breaker.guard(ignore=(QueueTimeout,)):
+            await self.governor.acquire()
+            try:
+                response = await self._run_in_executor(prompt, generation_config)
+            except TooManyRequests as e:
+                self.governor.backoff()
+                raise RateLimited(f"Gemini quota exhausted: {e}") from e
+        return response.text
+
+    async def _run_in_executor(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> Any:
+        """Run the SDK call on a worker thread; its governor slot is released when the thread is done
+
+        A blocking SDK call cannot be interrupted. If the caller is cancelled (e.g. the client
+        disconnected), a call still queued in the executor is dropped, while one already running
+        keeps its slot until it returns, so the governor never admits more calls than free threads.
+        """
+        future = self._submit(
+            self.model.generate_content, prompt, generation_config=generation_config,
+            request_options={"timeout": self.request_timeout}
+        )
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if future.running():
+                self.abandoned += 1
+            raise
+
+    def _submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Start fn on the executor holding an acquired governor slot, released when fn returns"""
+        loop = asyncio.get_running_loop()
+
+        def release(_):
+            try:
+                loop.call_soon_threadsafe(self.governor.release)
+            except RuntimeError:
+                pass  # Loop already closed at shutdown
+
+        try:
+            future = self.executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self.governor.release()
+            raise
+        future.add_done_callback(release)
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.governor.stats(), "abandoned_calls": self.abandoned, "parse_failures": self.parse_failures}
+
+    async def aclose(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.cache:
+            self.cache.close()
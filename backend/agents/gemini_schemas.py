@@ -0,0 +1,94 @@
+from typing import Any, Dict, Generic, List, Optional, TypeVar
+from pydantic import BaseModel, Field, TypeAdapter
+
+T = TypeVar("T")
+
+class Breakdown(BaseModel):
+    """Structured breakdown of a startup idea, as every downstream agent reads it"""
+    industry: str = Field(description="primary industry category")
+    business_model: str = Field(description="description of how the business makes money")
+    keywords: List[str] = Field(description="relevant industry keywords for market research")
+    geographic_scope: str = Field(description="local/national/global")
+    key_features: List[str] = Field(description="main product features")
+    regulatory_considerations: List[str] = Field(description="potential regulatory issues")
+    target_market: str = Field(description="description of target customers")
+    technology_stack: List[str] = Field(description="required technologies")
+
+class Competitor(BaseModel):
+    name: str = Field(description="real company name")
+    funding: float = Field(description="total funding raised, in millions USD")
+    market_share: float = Field(description="estimated market share, as a percentage")
+    description: str = Field(description="brief description of what they do")
+
+    def as_listing(self) -> Dict[str, Any]:
+        """The {name, funding, market_share} entry the competitor agent reports"""
+        return {"name": self.name, "funding": int(self.funding), "market_share": int(self.market_share)}
+
+class BreakdownWithCompetitors(Breakdown):
+    """Breakdown plus competitor discovery, answered in a single Gemini call"""
+    # Gemini emits keys alphabetically, so this name keeps the list behind every field
+    # the other agents wait on when the reply is streamed
+    suggested_competitors: List[Competitor] = Field(description="3-5 real, well-known direct competitors")
+
+class ResponseSchema(Generic[T]):
+    """A Gemini response_schema paired with the validator that parses replies into T"""
+
+    def __init__(self, name: str, response_type: Any):
+        self.name = name
+        self.adapter = TypeAdapter(response_type)
+        self.schema = _gemini_schema(self.adapter.json_schema())
+        # Per-field validators for object schemas, to check fields released mid-stream
+        self.field_adapters: Dict[str, TypeAdapter] = {}
+        if isinstance(response_type, type) and issubclass(response_type, BaseModel):
+            self.field_adapters = {
+                name: TypeAdapter(field.annotation) for name, field in response_type.model_fields.items()
+            }
+
+    @property
+    def generation_config(self) -> Dict[str, Any]:
+        return {"response_mime_type": "application/json", "response_schema": self.schema}
+
+    def parse(self, text: str) -> T:
+        """Validate reply text straight into T, with no intermediate dict; raises ValueError"""
+        return self.adapter.validate_json(text)
+
+    def validate_fields(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Validated copies of the fields that match their declared type; the rest are dropped"""
+        valid = {}
+        for name, value in fields.items():
+            adapter = self.field_adapters.get(name)
+            if adapter is None:
+                continue
+            try:
+                valid[name] = adapter.dump_python(adapter.validate_python(value), mode="json")
+            except ValueError:
+                continue
+        return valid
+
+    def load(self, payload: Any) -> T:
+        """Rebuild T from a cached dump()"""
+        return self.adapter.validate_python(payload)
+
+    def dump(self, value: T) -> Any:
+        return self.adapter.dump_python(value, mode="json")
+
+def _gemini_schema(json_schema: Dict[str, Any], defs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Reduce a pydantic JSON schema to the OpenAPI subset Gemini's response_schema accepts"""
+    defs = json_schema.get("$defs", defs or {})
+    if "$ref" in json_schema:
+        return _gemini_schema(defs[json_schema["$ref"].split("/")[-1]], defs)
+    schema: Dict[str, Any] = {"type": json_schema["type"]}
+    if "description" in json_schema:
+        schema["description"] = json_schema["description"]
+    if schema["type"] == "object":
+        schema["properties"] = {
+            name: _gemini_schema(prop, defs) for name, prop in json_schema["properties"].items()
+        }
+        schema["required"] = list(json_schema.get("required", ()))
+    elif schema["type"] == "array":
+        schema["items"] = _gemini_schema(json_schema["items"], defs)
+    return schema
+
+BREAKDOWN_SCHEMA = ResponseSchema("breakdown", Breakdown)
+COMPETITORS_SCHEMA = ResponseSchema("competitors", List[Competitor])
+FUSED_BREAKDOWN_SCHEMA = ResponseSchema("breakdown_competitors", BreakdownWithCompetitors)
@@ -0,0 +1,23 @@
+import hashlib
+import random
+import re
+from typing import Any, Dict, Optional, Tuple
+
+def normalize_idea(idea: str) -> str:
+    """Canonical form of an idea used to key coalescing and caching"""
+    return re.sub(r"\s+", " ", idea).strip().lower()
+
+def idea_hash(idea: str) -> str:
+    """Stable hash of the normalized idea, the root of every deterministic seed"""
+    return hashlib.sha256(normalize_idea(idea).encode()).hexdigest()
+
+def seeded_rng(seed: Optional[str], stream: str) -> random.Random:
+    """Independent RNG per agent stream, reproducible when a seed is given"""
+    if seed is None:
+        return random.Random()
+    return random.Random(f"{seed}:{stream}")
+
+def batch_group_key(breakdown: Dict[str, Any]) -> Tuple[str, Tuple[str, ...]]:
+    """Ideas sharing this key issue identical market, competitor and risk searches"""
+    # The agents build their queries verbatim from the industry plus at most three keywords
+    return breakdown.get("industry", "Technology"), tuple(breakdown.get("keywords", [])[:3])
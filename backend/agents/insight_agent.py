@@ -1,22 +1,16 @@
-import google.generativeai as genai
 import os
-from typing import Dict, Any
+import random
+from typing import Dict, Any, Optional
 import json
-from dotenv import load_dotenv
+from .gemini_client import GeminiClient
 
 class InsightAgent:
-    def __init__(self):
-        # Load environment variables
-        load_dotenv()
-        
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY not found in environment variables")
-            
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+    def __init__(self, gemini_client: Optional[GeminiClient] = None):
+        self.gemini = gemini_client or GeminiClient()
+        if not self.gemini.enabled:
+            print("⚠️ GEMINI_API_KEY not found, recommendations will skip the deep-mode narrative")
 
-    async def generate_recommendation(self, combined_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def generate_recommendation(self, combined_data: Dict[str, Any], deep: bool = False) -> Dict[str, Any]:
         # Calculate overall score based on multiple factors
         score = self._calculate_viability_score(combined_data)
         
@@ -26,23 +20,66 @@ class InsightAgent:
         # Generate key insights
         insights = await self._generate_insights(combined_data, score)
         
-        return {
+        recommendation = {
             "score": score,
             "verdict": verdict,
             "key_insights": insights
         }
+        
+        # Deep mode adds an LLM-written narrative on top of the rule-based scoring
+        if deep:
+            narrative = await self._generate_narrative(combined_data, recommendation)
+            if narrative:
+                recommendation["narrative"] = narrative
+        
+        return recommendation
+
+    async def fallback_recommendation(self, combined_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Rule-based recommendation; scoring and insights are already local"""
+        return await self.generate_recommendation(combined_data)
+
+    async def _generate_narrative(self, data: Dict[str, Any], recommendation: Dict[str, Any]) -> Optional[str]:
+        """Short investment memo from Gemini; None if Gemini is unavailable"""
+        if not self.gemini.enabled:
+            return None
+        breakdown = data.get("breakdown", {})
+        market = data.get("market_analysis", {})
+        competition = data.get("competition", {})
+        financial = data.get("financial_projections", {})
+        risks = data.get("risks", [])
+        
+        prompt = f"""
+        Write a concise investment memo (3 short paragraphs, plain text) for this startup idea.
+
+        Industry: {breakdown.get("industry", "Unknown")}
+        Business model: {breakdown.get("business_model", "Unknown")}
+        Target market: {breakdown.get("target_market", "Unknown")}
+        Market: TAM ${market.get("tam", 0)}B, SOM ${market.get("som", 0)}B, growth {market.get("growth_rate", 0)}%
+        Competitors: {", ".join(c.get("name", "") for c in competition.get("direct_competitors", []))}
+        Threat level: {competition.get("threat_level", "Unknown")}
+        Financials: revenue potential ${financial.get("revenue_potential", 0)}M, break-even {financial.get("break_even_timeline", 0)} months, ROI {financial.get("roi_projection", 0)}%
+        Key risks: {"; ".join(r.get("description", "") for r in risks[:3])}
+        Score: {recommendation["score"]}/100 ({recommendation["verdict"]})
+
+        Cover the opportunity, the main risks, and what to validate first.
+        """
+        
+        try:
+            return (await self.gemini.generate(prompt)).strip()
+        except Exception as e:
+            print(f"Narrative generation failed: {e}")
+            return None
 
     def _calculate_viability_score(self, data: Dict[str, Any]) -> int:
-        import random
         import hashlib
         
         # Create seed based on idea characteristics for consistent but varied scoring
         idea_characteristics = str(data.get("market_analysis", {}).get("tam", 0)) + str(data.get("competition", {}).get("threat_level", ""))
         score_seed = int(hashlib.md5(idea_characteristics.encode()).hexdigest()[:8], 16)
-        random.seed(score_seed)
+        rng = random.Random(score_seed)
         
         # More dynamic base score with wider variation
-        score = random.randint(35, 65)  # Wider base variation
+        score = rng.randint(35, 65)  # Wider base variation
         
         # Market factors (30% weight) - more nuanced scoring
         market = data.get("market_analysis", {})
@@ -52,35 +89,35 @@ class InsightAgent:
         
         # Growth rate scoring with more granularity
         if growth_rate > 15:
-            score += random.randint(18, 22)
+            score += rng.randint(18, 22)
         elif growth_rate > 10:
-            score += random.randint(12, 18)
+            score += rng.randint(12, 18)
         elif growth_rate > 7:
-            score += random.randint(8, 14)
+            score += rng.randint(8, 14)
         elif growth_rate > 3:
-            score += random.randint(4, 10)
+            score += rng.randint(4, 10)
         elif growth_rate > 0:
-            score += random.randint(1, 6)
+            score += rng.randint(1, 6)
         else:
-            score -= random.randint(5, 10)
+            score -= rng.randint(5, 10)
         
         # TAM scoring with more variation
         if tam > 3000:
-            score += random.randint(12, 16)
+            score += rng.randint(12, 16)
         elif tam > 1500:
-            score += random.randint(8, 12)
+            score += rng.randint(8, 12)
         elif tam > 800:
-            score += random.randint(5, 9)
+            score += rng.randint(5, 9)
         elif tam > 300:
-            score += random.randint(2, 6)
+            score += rng.randint(2, 6)
         else:
-            score -= random.randint(2, 5)
+            score -= rng.randint(2, 5)
         
         # SOM consideration
         if som > 50:
-            score += random.randint(3, 7)
+            score += rng.randint(3, 7)
         elif som > 20:
-            score += random.randint(1, 4)
+            score += rng.randint(1, 4)
         
         # Competition factors (25% weight) - more dynamic
         competition = data.get("competition", {})
@@ -88,19 +125,19 @@ class InsightAgent:
         competitors = competition.get("direct_competitors", [])
         
         if "low" in threat_level:
-            score += random.randint(12, 18)
+            score += rng.randint(12, 18)
         elif "medium" in threat_level:
-            score += random.randint(5, 12)
+            score += rng.randint(5, 12)
         elif "high" in threat_level:
-            score -= random.randint(3, 8)
+            score -= rng.randint(3, 8)
         
         # Consider competitor funding levels
         if competitors:
             avg_funding = sum(c.get("funding", 0) for c in competitors) / len(competitors)
             if avg_funding > 1000:  # Well-funded competitors
-                score -= random.randint(2, 6)
+                score -= rng.randint(2, 6)
             elif avg_funding < 200:  # Underfunded competitors
-                score += random.randint(2, 5)
+                score += rng.randint(2, 5)
         
         # Financial factors (25% weight) - more nuanced
         financial = data.get("financial_projections", {})
@@ -110,31 +147,31 @@ class InsightAgent:
         
         # ROI scoring with more variation
         if roi > 40:
-            score += random.randint(15, 20)
+            score += rng.randint(15, 20)
         elif roi > 30:
-            score += random.randint(10, 15)
+            score += rng.randint(10, 15)
         elif roi > 20:
-            score += random.randint(6, 12)
+            score += rng.randint(6, 12)
         elif roi > 10:
-            score += random.randint(2, 8)
+            score += rng.randint(2, 8)
         else:
-            score -= random.randint(2, 6)
+            score -= rng.randint(2, 6)
         
         # Break-even timeline scoring
         if break_even < 12:
-            score += random.randint(8, 12)
+            score += rng.randint(8, 12)
         elif break_even < 18:
-            score += random.randint(5, 9)
+            score += rng.randint(5, 9)
         elif break_even < 30:
-            score += random.randint(1, 5)
+            score += rng.randint(1, 5)
         else:
-            score -= random.randint(3, 8)
+            score -= rng.randint(3, 8)
         
         # Revenue potential consideration
         if revenue_potential > 500:
-            score += random.randint(3, 7)
+            score += rng.randint(3, 7)
         elif revenue_potential > 200:
-            score += random.randint(1, 4)
+            score += rng.randint(1, 4)
         
         # Risk factors (20% weight) - more detailed
         risks = data.get("risks", [])
@@ -142,24 +179,22 @@ class InsightAgent:
         medium_risks = sum(1 for risk in risks if risk.get("level") == "Medium")
         
         if high_risks == 0:
-            score += random.randint(8, 12)
+            score += rng.randint(8, 12)
         elif high_risks == 1:
-            score += random.randint(3, 7)
+            score += rng.randint(3, 7)
         elif high_risks == 2:
-            score -= random.randint(2, 5)
+            score -= rng.randint(2, 5)
         elif high_risks >= 3:
-            score -= random.randint(8, 15)
+            score -= rng.randint(8, 15)
         
         # Medium risks also matter
         if medium_risks > 3:
-            score -= random.randint(2, 5)
+            score -= rng.randint(2, 5)
         elif medium_risks == 0:
-            score += random.randint(1, 3)
+            score += rng.randint(1, 3)
         
         final_score = max(0, min(100, score))
         
-        # Reset random seed
-        random.seed()
         return final_score
 
     def _get_verdict(self, score: int) -> str:
@@ -0,0 +1,149 @@
+import asyncio
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+class JobQueueFull(Exception):
+    """Raised when the job queue is at its depth limit"""
+
+class Job:
+    """One queued analysis and, once finished, its retained result"""
+
+    def __init__(self, idea: str, options: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.idea = idea
+        self.options = options
+        self.status = "queued"
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error
+        }
+
+class JobQueue:
+    """Bounded worker pool running analyses off the request path
+
+    Finished jobs keep their result for result_ttl seconds, then are dropped.
+    """
+
+    def __init__(self, run: Callable[..., Awaitable[Dict[str, Any]]], workers: int = 4,
+                 max_queued: int = 100, result_ttl: float = 3600):
+        self.run = run
+        self.workers = workers
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self.jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+        self.submitted = 0
+        self.rejected = 0
+
+    def _ensure_workers(self):
+        # Started lazily so the queue and tasks bind to the serving event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, idea: str, **options) -> Job:
+        self._ensure_workers()
+        self._purge_expired()
+        job = Job(idea, options)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise JobQueueFull(f"Job queue is full ({self.max_queued} queued)")
+        self.jobs[job.id] = job
+        self.submitted += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._purge_expired()
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued or running job; finished jobs are returned unchanged"""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        if job.task is not None:
+            job.status = "cancelling"
+            job.task.cancel()
+        else:
+            # Still queued: the worker that dequeues it will skip it
+            self._finish(job, "cancelled")
+        return job
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.finished:
+                    continue
+                job.status = "running"
+                job.started_at = time.time()
+                job.task = asyncio.create_task(self.run(job.idea, **job.options))
+                try:
+                    job.result = await job.task
+                    self._finish(job, "completed")
+                except asyncio.CancelledError:
+                    # Cancelling the worker also cancels the task it awaits, so only cancel()
+                    # marking the job tells a cancelled job apart from a shutting-down worker
+                    if job.status != "cancelling":
+                        job.task.cancel()
+                        raise
+                    self._finish(job, "cancelled")
+                except Exception as e:
+                    print(f"❌ Job {job.id} failed: {e}")
+                    job.error = str(e)
+                    self._finish(job, "failed")
+                finally:
+                    job.task = None
+            finally:
+                self._queue.task_done()
+
+    def _finish(self, job: Job, status: str):
+        job.status = status
+        job.finished_at = time.time()
+
+    def _purge_expired(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queued": self.max_queued,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "jobs": counts
+        }
+
+    async def aclose(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
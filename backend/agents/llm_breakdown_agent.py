@@ -1,65 +1,84 @@
-import google.generativeai as genai
 import os
-from typing import Dict, Any
-import json
-from dotenv import load_dotenv
+from typing import Dict, Any, Optional
+from .gemini_client import GeminiClient
+from .gemini_schemas import BREAKDOWN_SCHEMA, FUSED_BREAKDOWN_SCHEMA
+from .streaming_json import IncrementalJSONObject, PartialResult
+from .rate_governor import RateLimited
+from .circuit_breaker import CircuitOpen
 
 class LLMBreakdownAgent:
-    def __init__(self):
-        # Load environment variables
-        load_dotenv()
-        
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY not found in environment variables")
-            
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+    def __init__(self, gemini_client: Optional[GeminiClient] = None, fused: Optional[bool] = None):
+        self.gemini = gemini_client or GeminiClient()
+        if not self.gemini.enabled:
+            print("⚠️ GEMINI_API_KEY not found, idea breakdown will use smart fallback analysis")
+        # Also ask for the competitor list (suggested_competitors), saving the competitor agent's call
+        self.fused = fused if fused is not None else os.getenv("GEMINI_FUSED_BREAKDOWN", "false").lower() == "true"
+        self.schema = FUSED_BREAKDOWN_SCHEMA if self.fused else BREAKDOWN_SCHEMA
 
     async def analyze(self, idea: str) -> Dict[str, Any]:
+        if not self.gemini.enabled:
+            return self._create_smart_fallback_breakdown(idea)
+        try:
+            # Validated breakdowns are cached, so repeat ideas skip Gemini entirely
+            breakdown = await self.gemini.generate_structured(self._breakdown_prompt(idea), self.schema)
+            return breakdown.model_dump()
+                
+        except ValueError as e:
+            # The reply did not match the schema (counted by the client)
+            print(f"LLM Breakdown parse error: {e}")
+            return self._create_smart_fallback_breakdown(idea)
+        except CircuitOpen:
+            # Gemini is known to be failing; skip straight to the local breakdown
+            return self._create_smart_fallback_breakdown(idea)
+        except RateLimited as e:
+            # The governor either could not admit the call in time or Gemini returned 429
+            print(f"Rate limit detected ({e}), using smart fallback analysis...")
+            return self._create_smart_fallback_breakdown(idea)
+        except Exception as e:
+            print(f"LLM Breakdown error: {e}")
+            return self._create_smart_fallback_breakdown(idea)
+
+    async def analyze_into(self, idea: str, partial: PartialResult, stream: bool = False):
+        """Fill partial with the breakdown, field by field as Gemini streams them when stream is set
+
+        partial is always finished on return (or cancellation): fields already handed to
+        waiting agents are kept and the smart fallback fills whatever never arrived.
+        """
+        try:
+            if not stream or not self.gemini.enabled:
+                partial.finish(await self.analyze(idea))
+                return
+            parser = IncrementalJSONObject()
+            async for chunk in self.gemini.generate_stream(self._breakdown_prompt(idea), self.schema):
+                # Agents read fields as soon as they are released, before the whole reply is
+                # validated, so a field of the wrong type is dropped and left to the fallback
+                partial.update(self.schema.validate_fields(parser.feed(chunk)))
+        except ValueError as e:
+            print(f"LLM Breakdown parse error: {e}")
+        except CircuitOpen:
+            pass
+        except RateLimited as e:
+            print(f"Rate limit detected ({e}), using smart fallback analysis...")
+        except Exception as e:
+            print(f"LLM Breakdown error: {e}")
+        finally:
+            partial.settle(self._create_smart_fallback_breakdown(idea))
+
+    def _breakdown_prompt(self, idea: str) -> str:
+        # The response shape (and each field's meaning) comes from self.schema
         prompt = f"""
         Analyze the following startup idea and break it down into structured categories:
 
         Startup Idea: {idea}
 
-        Please provide a JSON response with the following structure:
-        {{
-            "industry": "primary industry category",
-            "business_model": "description of how the business makes money",
-            "target_market": "description of target customers",
-            "key_features": ["list", "of", "main", "features"],
-            "technology_stack": ["required", "technologies"],
-            "regulatory_considerations": ["potential", "regulatory", "issues"],
-            "geographic_scope": "local/national/global",
-            "keywords": ["relevant", "industry", "keywords", "for", "research"]
-        }}
-
         Focus on being specific and actionable for market research.
         """
-
-        try:
-            response = self.model.generate_content(prompt)
-            # Extract JSON from response
-            response_text = response.text
-            
-            # Find JSON in the response
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = response_text[start_idx:end_idx]
-                return json.loads(json_str)
-            else:
-                # Fallback if JSON parsing fails
-                return self._create_smart_fallback_breakdown(idea)
-                
-        except Exception as e:
-            print(f"LLM Breakdown error: {e}")
-            # Check if it's a rate limit error
-            if "429" in str(e) or "quota" in str(e).lower():
-                print("Rate limit detected, using smart fallback analysis...")
-                return self._create_smart_fallback_breakdown(idea)
-            return self._create_smart_fallback_breakdown(idea)
+        if self.fused:
+            prompt += """
+        Also identify 3-5 real, well-known competitors a startup in this space would face directly,
+        with their most recent total funding raised (millions USD) and a realistic market share estimate.
+        """
+        return prompt
 
     def _create_fallback_breakdown(self, idea: str) -> Dict[str, Any]:
         return {
@@ -1,14 +1,14 @@
-import requests
 import asyncio
-from typing import Dict, Any
+import statistics
+from typing import Dict, Any, List, Optional, Tuple
 import random
-import os
-from dotenv import load_dotenv
+from .serpapi_client import SerpAPIClient
 
 class MarketAnalysisAgent:
-    def __init__(self):
-        load_dotenv()
-        self.serpapi_key = os.getenv("SERPAPI_KEY")
+    BREAKDOWN_FIELDS = ("industry", "keywords", "business_model")
+
+    def __init__(self, serpapi_client: Optional[SerpAPIClient] = None):
+        self.serpapi = serpapi_client or SerpAPIClient()
         self.world_bank_base = "https://api.worldbank.org/v2"
         
         # Fallback data if APIs fail
@@ -21,15 +21,37 @@ class MarketAnalysisAgent:
             "default": {"tam": 1000, "growth": 5.5}
         }
 
-    async def analyze(self, breakdown: Dict[str, Any]) -> Dict[str, Any]:
+    async def analyze(self, breakdown: Dict[str, Any], rng: Optional[random.Random] = None,
+                      deep: bool = False) -> Dict[str, Any]:
+        rng = rng or random.Random()
         industry = breakdown.get("industry", "Technology").lower()
         keywords = breakdown.get("keywords", [])
         business_model = breakdown.get("business_model", "")
         
         # Get real market data from external sources
-        market_data = await self._fetch_real_market_data(industry, keywords, business_model)
-        trends = await self._get_market_trends(industry, keywords)
+        market_data = await self._fetch_real_market_data(industry, keywords, business_model, deep)
+        trends = await self._get_market_trends(industry, keywords, rng)
+        
+        return self._build_result(market_data, trends)
+
+    def search_requests(self, breakdown: Dict[str, Any], deep: bool = False) -> List[Tuple[Dict[str, Any], str]]:
+        """The SerpAPI searches analyze() issues for this breakdown, as (params, query_type)"""
+        industry = breakdown.get("industry", "Technology").lower()
+        queries = self._market_queries(industry, breakdown.get("keywords", []), deep)
+        return [(self._market_params(query, deep), "market") for query in queries]
+
+    async def fallback_analysis(self, breakdown: Dict[str, Any], rng: Optional[random.Random] = None) -> Dict[str, Any]:
+        """Local-only market estimate, no network calls"""
+        rng = rng or random.Random()
+        industry = breakdown.get("industry", "Technology").lower()
+        keywords = breakdown.get("keywords", [])
+        
+        market_data = self._get_fallback_estimates(industry, keywords)
+        trends = await self._get_market_trends(industry, keywords, rng)
         
+        return self._build_result(market_data, trends)
+
+    def _build_result(self, market_data: Dict[str, float], trends: list) -> Dict[str, Any]:
         return {
             "tam": market_data["tam"],
             "sam": round(market_data["tam"] * market_data["sam_ratio"], 1),
@@ -38,11 +60,12 @@ class MarketAnalysisAgent:
             "market_trends": trends
         }
 
-    async def _fetch_real_market_data(self, industry: str, keywords: list, business_model: str) -> Dict[str, float]:
+    async def _fetch_real_market_data(self, industry: str, keywords: list, business_model: str,
+                                      deep: bool = False) -> Dict[str, float]:
         """Fetch real market data from external sources"""
         try:
             # Search for market size data using SerpAPI
-            market_data = await self._search_market_size(industry, keywords)
+            market_data = await self._search_market_size(industry, keywords, deep)
             
             # Calculate SAM and SOM ratios based on business model and industry
             sam_ratio, som_ratio = self._calculate_market_ratios(business_model, industry)
@@ -57,42 +80,61 @@ class MarketAnalysisAgent:
             print(f"Failed to fetch real market data: {e}")
             return self._get_fallback_estimates(industry, keywords)
 
-    async def _search_market_size(self, industry: str, keywords: list) -> Dict[str, float]:
-        """Search for market size using SerpAPI"""
-        if not self.serpapi_key:
+    async def _search_market_size(self, industry: str, keywords: list, deep: bool = False) -> Dict[str, float]:
+        """Search for market size using SerpAPI; deep mode takes the consensus of several queries"""
+        if not self.serpapi.enabled:
             raise Exception("SerpAPI key not available")
         
+        queries = self._market_queries(industry, keywords, deep)
+        results = await asyncio.gather(
+            *(self._query_market_metrics(query, industry, deep) for query in queries),
+            return_exceptions=True
+        )
+        metrics = [result for result in results if not isinstance(result, Exception)]
+        if not metrics:
+            raise results[0]
+        
+        # Median across queries so one outlier snippet cannot skew the estimate
+        return {
+            "tam": statistics.median(tam for tam, _ in metrics),
+            "growth": statistics.median(growth for _, growth in metrics)
+        }
+
+    def _market_queries(self, industry: str, keywords: list, deep: bool = False) -> List[str]:
         # Create search query for market size
         search_terms = [industry] + keywords[:3]  # Limit keywords
-        query = f"{' '.join(search_terms)} market size 2024 billion growth rate"
-        
-        params = {
+        queries = [f"{' '.join(search_terms)} market size 2024 billion growth rate"]
+        if deep:
+            queries += [
+                f"{' '.join(search_terms)} market forecast CAGR",
+                f"{industry} industry market size report"
+            ]
+        return queries
+
+    def _market_params(self, query: str, deep: bool = False) -> Dict[str, Any]:
+        return {
             "engine": "google",
             "q": query,
-            "api_key": self.serpapi_key,
-            "num": 5
+            "num": 10 if deep else 5
         }
-        
+
+    async def _query_market_metrics(self, query: str, industry: str, deep: bool) -> tuple:
         try:
-            response = requests.get("https://serpapi.com/search", params=params, timeout=10)
-            data = response.json()
+            data = await self.serpapi.search(self._market_params(query, deep), query_type="market")
             
             # Extract market size from search results
-            tam, growth = self._extract_market_metrics(data, industry)
-            
-            return {"tam": tam, "growth": growth}
+            return self._extract_market_metrics(data, industry, scan=10 if deep else 3)
         except Exception as e:
             print(f"SerpAPI search failed: {e}")
             raise e
 
-    def _extract_market_metrics(self, search_data: dict, industry: str) -> tuple:
+    def _extract_market_metrics(self, search_data: dict, industry: str, scan: int = 3) -> tuple:
         """Extract TAM and growth rate from search results with more realistic baselines"""
-        import random
         import hashlib
         
         # Create consistent but varied baseline based on industry
         industry_hash = int(hashlib.md5(industry.encode()).hexdigest()[:8], 16)
-        random.seed(industry_hash)
+        rng = random.Random(industry_hash)
         
         # More realistic TAM baselines by industry
         industry_tam_ranges = {
@@ -117,13 +159,13 @@ class MarketAnalysisAgent:
                 tam_range = range_val
                 break
         
-        tam = random.uniform(tam_range[0], tam_range[1])
+        tam = rng.uniform(tam_range[0], tam_range[1])
         
         # Look through organic results for market size mentions to adjust baseline
         organic_results = search_data.get("organic_results", [])
         
         found_real_data = False
-        for result in organic_results[:3]:  # Check first 3 results
+        for result in organic_results[:scan]:  # Check the first few results
             snippet = result.get("snippet", "").lower()
             title = result.get("title", "").lower()
             text = f"{title} {snippet}"
@@ -149,9 +191,9 @@ class MarketAnalysisAgent:
                 break
         
         # Extract growth rate with more variation
-        growth = self._get_industry_growth_rate(industry)
+        growth = self._get_industry_growth_rate(industry, rng)
         
-        for result in organic_results[:3]:
+        for result in organic_results[:scan]:
             snippet = result.get("snippet", "").lower()
             title = result.get("title", "").lower()
             text = f"{title} {snippet}"
@@ -165,18 +207,13 @@ class MarketAnalysisAgent:
                 break
         
         # Apply industry-specific adjustments with more variation
-        tam = self._adjust_tam_by_industry(tam, industry)
+        tam = self._adjust_tam_by_industry(tam, industry, rng)
         growth = max(1.0, min(growth, 45.0))  # Cap between 1% and 45%
         
-        # Reset random seed
-        random.seed()
-        
         return tam, growth
 
-    def _get_industry_growth_rate(self, industry: str) -> float:
+    def _get_industry_growth_rate(self, industry: str, rng: random.Random) -> float:
         """Get industry-specific growth rates with variation"""
-        import random
-        
         growth_ranges = {
             "technology": (8.5, 15.2),
             "healthcare": (6.2, 12.8),
@@ -193,15 +230,13 @@ class MarketAnalysisAgent:
         # Find matching industry
         for key, (min_growth, max_growth) in growth_ranges.items():
             if key in industry.lower():
-                return round(random.uniform(min_growth, max_growth), 1)
+                return round(rng.uniform(min_growth, max_growth), 1)
         
         # Default with variation
-        return round(random.uniform(5.0, 12.0), 1)
+        return round(rng.uniform(5.0, 12.0), 1)
 
-    def _adjust_tam_by_industry(self, base_tam: float, industry: str) -> float:
+    def _adjust_tam_by_industry(self, base_tam: float, industry: str, rng: random.Random) -> float:
         """Adjust TAM based on industry characteristics with more variation"""
-        import random
-        
         multiplier_ranges = {
             "technology": (1.1, 1.4),
             "healthcare": (0.8, 1.1),
@@ -218,13 +253,13 @@ class MarketAnalysisAgent:
         # Find matching industry and apply random multiplier within range
         for key, (min_mult, max_mult) in multiplier_ranges.items():
             if key in industry.lower():
-                multiplier = random.uniform(min_mult, max_mult)
+                multiplier = rng.uniform(min_mult, max_mult)
                 adjusted_tam = base_tam * multiplier
                 # Cap TAM at reasonable maximum (5000B = $5T)
                 return min(adjusted_tam, 5000.0)
         
         # Default with slight variation and cap
-        adjusted_tam = base_tam * random.uniform(0.9, 1.2)
+        adjusted_tam = base_tam * rng.uniform(0.9, 1.2)
         return min(adjusted_tam, 5000.0)
 
     def _calculate_market_ratios(self, business_model: str, industry: str) -> tuple:
@@ -280,107 +315,105 @@ class MarketAnalysisAgent:
             "som_ratio": 0.01
         }
 
-    async def _get_market_trends(self, industry: str, keywords: list) -> list:
+    async def _get_market_trends(self, industry: str, keywords: list, rng: random.Random) -> list:
         """Get dynamic, industry-specific market trends with real data context"""
-        import random
-        
         # Enhanced trend templates with more variety
         trend_templates = {
             "technology": [
-                f"AI and machine learning adoption increasing by {random.randint(20, 35)}% annually",
-                f"Cloud infrastructure spending up {random.randint(15, 25)}% year-over-year",
-                f"SaaS market growing at {random.randint(12, 18)}% CAGR through 2028",
-                f"Mobile-first solutions capturing {random.randint(65, 85)}% of new user acquisition",
-                f"Automation tools reducing operational costs by {random.randint(25, 40)}%",
-                f"API-first architecture adoption up {random.randint(30, 50)}% in enterprise"
+                f"AI and machine learning adoption increasing by {rng.randint(20, 35)}% annually",
+                f"Cloud infrastructure spending up {rng.randint(15, 25)}% year-over-year",
+                f"SaaS market growing at {rng.randint(12, 18)}% CAGR through 2028",
+                f"Mobile-first solutions capturing {rng.randint(65, 85)}% of new user acquisition",
+                f"Automation tools reducing operational costs by {rng.randint(25, 40)}%",
+                f"API-first architecture adoption up {rng.randint(30, 50)}% in enterprise"
             ],
             "logistics": [
-                f"Last-mile delivery costs rising {random.randint(12, 20)}% annually",
-                f"Drone delivery market expected to grow {random.randint(45, 65)}% CAGR",
-                f"Autonomous vehicle adoption in logistics up {random.randint(25, 40)}%",
-                f"Supply chain digitization reducing costs by {random.randint(15, 30)}%",
-                f"Same-day delivery demand increased {random.randint(150, 250)}% since 2020",
-                f"Green logistics initiatives driving {random.randint(20, 35)}% of new investments"
+                f"Last-mile delivery costs rising {rng.randint(12, 20)}% annually",
+                f"Drone delivery market expected to grow {rng.randint(45, 65)}% CAGR",
+                f"Autonomous vehicle adoption in logistics up {rng.randint(25, 40)}%",
+                f"Supply chain digitization reducing costs by {rng.randint(15, 30)}%",
+                f"Same-day delivery demand increased {rng.randint(150, 250)}% since 2020",
+                f"Green logistics initiatives driving {rng.randint(20, 35)}% of new investments"
             ],
             "healthcare": [
-                f"Telemedicine adoption increased {random.randint(2500, 4500)}% since 2020",
-                f"Digital health funding reached ${random.randint(25, 35)}.{random.randint(1, 9)}B in 2024",
-                f"AI diagnostics market growing {random.randint(35, 55)}% annually",
-                f"Remote patient monitoring up {random.randint(180, 280)}% post-pandemic",
-                f"Healthcare data interoperability investments up {random.randint(40, 60)}%",
-                f"Wearable health device adoption growing {random.randint(25, 40)}% yearly"
+                f"Telemedicine adoption increased {rng.randint(2500, 4500)}% since 2020",
+                f"Digital health funding reached ${rng.randint(25, 35)}.{rng.randint(1, 9)}B in 2024",
+                f"AI diagnostics market growing {rng.randint(35, 55)}% annually",
+                f"Remote patient monitoring up {rng.randint(180, 280)}% post-pandemic",
+                f"Healthcare data interoperability investments up {rng.randint(40, 60)}%",
+                f"Wearable health device adoption growing {rng.randint(25, 40)}% yearly"
             ],
             "fintech": [
-                f"Digital payment volume up {random.randint(20, 35)}% year-over-year",
-                f"SMB fintech adoption increased {random.randint(150, 250)}% since 2020",
-                f"Embedded finance market growing {random.randint(25, 40)}% CAGR",
-                f"Cryptocurrency integration in payments up {random.randint(300, 500)}%",
-                f"AI-powered fraud detection reducing losses by {random.randint(30, 50)}%",
-                f"Open banking APIs driving {random.randint(40, 60)}% of new fintech solutions"
+                f"Digital payment volume up {rng.randint(20, 35)}% year-over-year",
+                f"SMB fintech adoption increased {rng.randint(150, 250)}% since 2020",
+                f"Embedded finance market growing {rng.randint(25, 40)}% CAGR",
+                f"Cryptocurrency integration in payments up {rng.randint(300, 500)}%",
+                f"AI-powered fraud detection reducing losses by {rng.randint(30, 50)}%",
+                f"Open banking APIs driving {rng.randint(40, 60)}% of new fintech solutions"
             ],
             "ecommerce": [
-                f"Social commerce growing {random.randint(25, 40)}% annually",
-                f"Mobile commerce now {random.randint(60, 75)}% of total e-commerce",
-                f"AI personalization increasing conversion by {random.randint(15, 30)}%",
-                f"Voice commerce adoption up {random.randint(100, 200)}% year-over-year",
-                f"Subscription commerce models growing {random.randint(20, 35)}% CAGR",
-                f"Cross-border e-commerce up {random.randint(15, 25)}% annually"
+                f"Social commerce growing {rng.randint(25, 40)}% annually",
+                f"Mobile commerce now {rng.randint(60, 75)}% of total e-commerce",
+                f"AI personalization increasing conversion by {rng.randint(15, 30)}%",
+                f"Voice commerce adoption up {rng.randint(100, 200)}% year-over-year",
+                f"Subscription commerce models growing {rng.randint(20, 35)}% CAGR",
+                f"Cross-border e-commerce up {rng.randint(15, 25)}% annually"
             ],
             "electric vehicle": [
-                f"EV sales growing {random.randint(40, 80)}% annually in India",
-                f"EV charging infrastructure investment up {random.randint(200, 400)}% since 2020",
-                f"Government EV subsidies driving {random.randint(30, 50)}% of new purchases",
-                f"Fast charging network expanding {random.randint(150, 300)}% year-over-year",
-                f"EV charging app downloads increased {random.randint(250, 500)}% in 2024",
-                f"Battery technology improvements reducing charging time by {random.randint(25, 45)}%"
+                f"EV sales growing {rng.randint(40, 80)}% annually in India",
+                f"EV charging infrastructure investment up {rng.randint(200, 400)}% since 2020",
+                f"Government EV subsidies driving {rng.randint(30, 50)}% of new purchases",
+                f"Fast charging network expanding {rng.randint(150, 300)}% year-over-year",
+                f"EV charging app downloads increased {rng.randint(250, 500)}% in 2024",
+                f"Battery technology improvements reducing charging time by {rng.randint(25, 45)}%"
             ],
             "automotive": [
-                f"Electric vehicle adoption growing {random.randint(35, 65)}% annually",
-                f"Autonomous vehicle testing up {random.randint(100, 200)}% year-over-year",
-                f"Connected car features now in {random.randint(70, 90)}% of new vehicles",
-                f"Automotive software market growing {random.randint(20, 35)}% CAGR",
-                f"Vehicle-as-a-Service models up {random.randint(40, 70)}% annually",
-                f"Automotive cybersecurity spending increased {random.randint(50, 100)}%"
+                f"Electric vehicle adoption growing {rng.randint(35, 65)}% annually",
+                f"Autonomous vehicle testing up {rng.randint(100, 200)}% year-over-year",
+                f"Connected car features now in {rng.randint(70, 90)}% of new vehicles",
+                f"Automotive software market growing {rng.randint(20, 35)}% CAGR",
+                f"Vehicle-as-a-Service models up {rng.randint(40, 70)}% annually",
+                f"Automotive cybersecurity spending increased {rng.randint(50, 100)}%"
             ],
             "energy": [
-                f"Renewable energy capacity growing {random.randint(15, 30)}% annually",
-                f"Smart grid investments up {random.randint(25, 45)}% year-over-year",
-                f"Energy storage market expanding {random.randint(40, 70)}% CAGR",
-                f"Distributed energy resources growing {random.randint(30, 50)}% annually",
-                f"Energy management software adoption up {random.randint(60, 120)}%",
-                f"Carbon offset market growing {random.randint(20, 40)}% yearly"
+                f"Renewable energy capacity growing {rng.randint(15, 30)}% annually",
+                f"Smart grid investments up {rng.randint(25, 45)}% year-over-year",
+                f"Energy storage market expanding {rng.randint(40, 70)}% CAGR",
+                f"Distributed energy resources growing {rng.randint(30, 50)}% annually",
+                f"Energy management software adoption up {rng.randint(60, 120)}%",
+                f"Carbon offset market growing {rng.randint(20, 40)}% yearly"
             ],
             "mobility": [
-                f"Shared mobility services growing {random.randint(20, 35)}% annually",
-                f"Micro-mobility adoption up {random.randint(100, 200)}% in urban areas",
-                f"Mobility-as-a-Service platforms expanding {random.randint(40, 70)}% CAGR",
-                f"Electric mobility options increased {random.randint(150, 300)}% since 2020",
-                f"Integrated transport apps growing {random.randint(50, 90)}% user base",
-                f"Sustainable transport investments up {random.randint(80, 150)}%"
+                f"Shared mobility services growing {rng.randint(20, 35)}% annually",
+                f"Micro-mobility adoption up {rng.randint(100, 200)}% in urban areas",
+                f"Mobility-as-a-Service platforms expanding {rng.randint(40, 70)}% CAGR",
+                f"Electric mobility options increased {rng.randint(150, 300)}% since 2020",
+                f"Integrated transport apps growing {rng.randint(50, 90)}% user base",
+                f"Sustainable transport investments up {rng.randint(80, 150)}%"
             ],
             "education": [
-                f"EdTech market in India growing {random.randint(25, 45)}% annually",
-                f"Online learning adoption increased {random.randint(300, 600)}% post-COVID",
-                f"Rural education digitization investments up {random.randint(150, 300)}%",
-                f"Government Digital India education spending increased {random.randint(40, 80)}%",
-                f"Offline-first learning solutions demand up {random.randint(200, 400)}%",
-                f"Vernacular language learning content growing {random.randint(100, 200)}%"
+                f"EdTech market in India growing {rng.randint(25, 45)}% annually",
+                f"Online learning adoption increased {rng.randint(300, 600)}% post-COVID",
+                f"Rural education digitization investments up {rng.randint(150, 300)}%",
+                f"Government Digital India education spending increased {rng.randint(40, 80)}%",
+                f"Offline-first learning solutions demand up {rng.randint(200, 400)}%",
+                f"Vernacular language learning content growing {rng.randint(100, 200)}%"
             ],
             "edtech": [
-                f"Indian EdTech market valued at ${random.randint(3, 8)}.{random.randint(1, 9)}B in 2024",
-                f"Rural EdTech penetration growing {random.randint(35, 65)}% annually",
-                f"Offline learning solutions market expanding {random.randint(150, 300)}%",
-                f"Government school digitization budget increased {random.randint(50, 120)}%",
-                f"Tablet-based learning adoption up {random.randint(200, 400)}% in rural areas",
-                f"Local language EdTech content demand up {random.randint(180, 350)}%"
+                f"Indian EdTech market valued at ${rng.randint(3, 8)}.{rng.randint(1, 9)}B in 2024",
+                f"Rural EdTech penetration growing {rng.randint(35, 65)}% annually",
+                f"Offline learning solutions market expanding {rng.randint(150, 300)}%",
+                f"Government school digitization budget increased {rng.randint(50, 120)}%",
+                f"Tablet-based learning adoption up {rng.randint(200, 400)}% in rural areas",
+                f"Local language EdTech content demand up {rng.randint(180, 350)}%"
             ],
             "rural": [
-                f"Rural internet penetration growing {random.randint(15, 30)}% annually in India",
-                f"Digital literacy programs reaching {random.randint(50, 100)}M rural Indians",
-                f"Rural smartphone adoption up {random.randint(40, 70)}% year-over-year",
-                f"Government rural digitization spending increased {random.randint(60, 120)}%",
-                f"Offline-first solutions demand up {random.randint(200, 400)}% in rural areas",
-                f"Rural fintech and edtech adoption growing {random.randint(100, 250)}%"
+                f"Rural internet penetration growing {rng.randint(15, 30)}% annually in India",
+                f"Digital literacy programs reaching {rng.randint(50, 100)}M rural Indians",
+                f"Rural smartphone adoption up {rng.randint(40, 70)}% year-over-year",
+                f"Government rural digitization spending increased {rng.randint(60, 120)}%",
+                f"Offline-first solutions demand up {rng.randint(200, 400)}% in rural areas",
+                f"Rural fintech and edtech adoption growing {rng.randint(100, 250)}%"
             ]
         }
         
@@ -425,7 +458,7 @@ class MarketAnalysisAgent:
                 relevant_keywords = [kw for kw in keywords if kw.lower() in trend.lower()]
                 if not relevant_keywords and len(keywords) > 0:
                     # Add a keyword-specific trend
-                    keyword = random.choice(keywords[:3])
+                    keyword = rng.choice(keywords[:3])
                     trend += f" - particularly relevant for {keyword.lower()} solutions"
             enhanced_trends.append(trend)
         
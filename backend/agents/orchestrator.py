@@ -1,89 +1,189 @@
-import asyncio
-from typing import Dict, Any
+import os
+import random
+from functools import cached_property
+from typing import Dict, Any, Awaitable, Callable, Iterable, List, Optional, Set
 from .portia_orchestrator import PortiaOrchestrator
 from .llm_breakdown_agent import LLMBreakdownAgent
+from .market_agent import MarketAnalysisAgent
+from .competitor_agent import CompetitorAgent
+from .financial_agent import FinancialAgent
+from .risk_agent import RiskAgent
+from .insight_agent import InsightAgent
+from .serpapi_client import SerpAPIClient
+from .gemini_client import GeminiClient
+from .idea_key import idea_hash, seeded_rng
+from .deadline import Deadline
+from .analysis_graph import RESPONSE_SECTIONS, analysis_context, build_analysis_graph
+from .dag import DAGRun
+
+# Awaited with (section_name, section_data) as each section of the analysis resolves
+SectionCallback = Callable[[str, Any], Awaitable[None]]
+
+# Bump whenever agent logic changes so cached full analyses are not served stale
+PIPELINE_VERSION = "3"
+
+# fast: local heuristics only; standard: the cached multi-agent pipeline;
+# deep: wider searches, multi-query consensus and an LLM narrative
+ANALYSIS_MODES = ("fast", "standard", "deep")
+
+def project_fields(results: Dict[str, Any], fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Keep only the requested sections (plus tier/degradation metadata) of a result"""
+    requested = set(fields or RESPONSE_SECTIONS)
+    projected = {
+        section: results[section]
+        for section in ("breakdown", *RESPONSE_SECTIONS)
+        if section in requested and section in results
+    }
+    for key in ("degraded_sections", "tier"):
+        if key in results:
+            projected[key] = results[key]
+    return projected
 
 class AnalysisOrchestrator:
-    def __init__(self):
-        self.breakdown_agent = LLMBreakdownAgent()
-        self.portia_orchestrator = PortiaOrchestrator()
+    def __init__(self, serpapi_client: Optional[SerpAPIClient] = None,
+                 gemini_client: Optional[GeminiClient] = None):
+        # Shared pooled SerpAPI client handed to every search-backed agent
+        self.serpapi_client = serpapi_client or SerpAPIClient()
+        # Shared bounded Gemini executor handed to every LLM-backed agent
+        self.gemini_client = gemini_client or GeminiClient()
+        # Its local fallback runs on this orchestrator's agents and shared clients
+        self.portia_orchestrator = PortiaOrchestrator(self)
+        
+        # Agents are stateless per request, so one instance serves all requests. Every
+        # analysis needs the breakdown; the rest are built on first use so a deployment
+        # that only ever asks for some fields never constructs the others.
+        self.breakdown_agent = LLMBreakdownAgent(self.gemini_client)
+        # Declarative breakdown -> agents -> insight graph; each node starts once its inputs resolve
+        self.pipeline = build_analysis_graph(self)
+        # Start SerpAPI searches from the local breakdown guess instead of waiting for Gemini
+        self.speculative = os.getenv("SPECULATIVE_PREFETCH", "false").lower() == "true"
+        # Stream the Gemini breakdown so each agent starts once the fields it reads have arrived
+        self.stream_breakdown = os.getenv("BREAKDOWN_STREAMING", "false").lower() == "true"
+
+    @cached_property
+    def market_agent(self) -> MarketAnalysisAgent:
+        return MarketAnalysisAgent(self.serpapi_client)
 
-    async def analyze_startup_idea(self, idea: str) -> Dict[str, Any]:
+    @cached_property
+    def competitor_agent(self) -> CompetitorAgent:
+        return CompetitorAgent(self.serpapi_client, self.gemini_client)
+
+    @cached_property
+    def financial_agent(self) -> FinancialAgent:
+        return FinancialAgent()
+
+    @cached_property
+    def risk_agent(self) -> RiskAgent:
+        return RiskAgent(self.serpapi_client)
+
+    @cached_property
+    def insight_agent(self) -> InsightAgent:
+        return InsightAgent(self.gemini_client)
+
+    async def analyze_startup_idea(self, idea: str, deterministic: bool = False,
+                                   deadline: Optional[Deadline] = None,
+                                   on_section: Optional[SectionCallback] = None,
+                                   breakdown: Optional[Dict[str, Any]] = None,
+                                   deep: bool = False,
+                                   fields: Optional[List[str]] = None) -> Dict[str, Any]:
         print(f"🚀 Starting comprehensive analysis for idea: {idea[:100]}...")
         
+        # In deterministic mode every random draw derives from the idea hash
+        seed = idea_hash(idea) if deterministic else None
+        # Every section that completes is kept here, so a failure only redoes what failed
+        checkpoint = DAGRun()
+        
         try:
             # Use our enhanced agent analysis directly (no Portia AI dependency)
-            return await self._comprehensive_analysis(idea)
+            return await self._comprehensive_analysis(idea, seed, deadline, on_section, breakdown, deep, fields, checkpoint)
             
         except Exception as e:
             print(f"❌ Comprehensive analysis failed: {e}")
             print("🔄 Falling back to basic analysis...")
             # Fallback to basic analysis if main analysis fails
-            return await self._fallback_analysis(idea)
+            return await self._fallback_analysis(idea, seed, deadline, on_section, breakdown, deep, fields, checkpoint)
     
-    async def _comprehensive_analysis(self, idea: str) -> Dict[str, Any]:
+    def required_sections(self, fields: Optional[Iterable[str]] = None) -> Set[str]:
+        """Every section the requested fields depend on; raises ValueError for unknown fields"""
+        return self.pipeline.closure(fields or RESPONSE_SECTIONS)
+
+    async def _run_pipeline(self, idea: str, seed: Optional[str], deadline: Optional[Deadline],
+                            on_section: Optional[SectionCallback] = None,
+                            breakdown: Optional[Dict[str, Any]] = None,
+                            deep: bool = False, fields: Optional[List[str]] = None,
+                            checkpoint: Optional[DAGRun] = None, verbose: bool = False) -> Dict[str, Any]:
+        """Run the analysis graph, each node bounded by its share of the deadline
+
+        A breakdown computed up front (e.g. by the batch grouper) is not recomputed. deep
+        widens every search and adds an LLM narrative to the recommendation. fields limits
+        the run to the nodes those sections depend on. A checkpoint from an earlier failed
+        attempt is resumed rather than recomputed.
+        """
+        run = await self.pipeline.run(
+            analysis_context(
+                idea, self._agent_rngs(seed), deep,
+                # Nothing to speculate about when the breakdown is already known
+                speculative=self.speculative and breakdown is None,
+                sections=self.required_sections(fields),
+                breakdown=breakdown,
+                stream_breakdown=self.stream_breakdown
+            ),
+            # The breakdown node owns the Gemini call, so it always runs to be awaited or cancelled
+            targets=[*(fields or RESPONSE_SECTIONS), "breakdown"],
+            deadline=deadline,
+            on_result=on_section,
+            resume=checkpoint
+        )
+        if verbose:
+            print(f"   ⏱️ Node timings: {run.describe_timings()}")
+            if "recommendation" in run.values:
+                print(f"   ✅ Final score: {run.values['recommendation'].get('score', 0)}/100")
+        
+        return project_fields(
+            {**run.values, "degraded_sections": run.degraded, "tier": "deep" if deep else "standard"},
+            fields
+        )
+
+    async def heuristic_analysis(self, idea: str, deterministic: bool = False,
+                                 on_section: Optional[SectionCallback] = None,
+                                 tier: str = "degraded",
+                                 fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Zero-network tier built only from each agent's local fallback
+
+        Serves mode=fast directly (tier "fast") and sheds overload from the other modes (tier "degraded").
+        """
+        print(f"🪫 Heuristic-only ({tier}) analysis for idea: {idea[:100]}...")
+        seed = idea_hash(idea) if deterministic else None
+        run = await self.pipeline.run(
+            analysis_context(idea, self._agent_rngs(seed)),
+            targets=fields or RESPONSE_SECTIONS,
+            on_result=on_section,
+            local_only=True
+        )
+        return project_fields({**run.values, "degraded_sections": [], "tier": tier}, fields)
+
+    def _agent_rngs(self, seed: Optional[str]) -> Dict[str, random.Random]:
+        """One RNG per agent so results do not depend on task scheduling order"""
+        return {name: seeded_rng(seed, name) for name in ("market", "competitor", "financial", "risk")}
+
+    def is_cacheable(self, results: Dict[str, Any], mode: str = "standard") -> bool:
+        """Only complete results of the requested mode go in that mode's response cache"""
+        if results.get("degraded_sections") or results.get("tier") != mode:
+            return False
+        return results.get("recommendation", {}).get("verdict") != "Analysis Incomplete"
+
+    async def _comprehensive_analysis(self, idea: str, seed: Optional[str] = None,
+                                      deadline: Optional[Deadline] = None,
+                                      on_section: Optional[SectionCallback] = None,
+                                      breakdown: Optional[Dict[str, Any]] = None,
+                                      deep: bool = False,
+                                      fields: Optional[List[str]] = None,
+                                      checkpoint: Optional[DAGRun] = None) -> Dict[str, Any]:
         """Comprehensive analysis using our enhanced agents"""
         print("📊 Running comprehensive multi-agent analysis...")
         
         try:
-            # Step 1: LLM Breakdown
-            print("🔍 Step 1: Analyzing idea structure and categorization...")
-            breakdown = await self.breakdown_agent.analyze(idea)
-            print(f"   ✅ Industry identified: {breakdown.get('industry', 'Unknown')}")
-            print(f"   ✅ Keywords extracted: {breakdown.get('keywords', [])[:3]}")
-            
-            # Import agents
-            from .market_agent import MarketAnalysisAgent
-            from .competitor_agent import CompetitorAgent
-            from .financial_agent import FinancialAgent
-            from .risk_agent import RiskAgent
-            from .insight_agent import InsightAgent
-            
-            market_agent = MarketAnalysisAgent()
-            competitor_agent = CompetitorAgent()
-            financial_agent = FinancialAgent()
-            risk_agent = RiskAgent()
-            insight_agent = InsightAgent()
-            
-            # Step 2: Parallel Agent Analysis
-            print("🔄 Step 2: Running parallel agent analysis...")
-            print("   📈 Market analysis agent...")
-            print("   🏆 Competitor analysis agent...")
-            print("   💰 Financial projections agent...")
-            print("   ⚠️  Risk assessment agent...")
-            
-            tasks = [
-                market_agent.analyze(breakdown),
-                competitor_agent.analyze(breakdown),
-                financial_agent.analyze(breakdown),
-                risk_agent.analyze(breakdown)
-            ]
-            
-            market_data, competitor_data, financial_data, risk_data = await asyncio.gather(*tasks)
-            
-            print("   ✅ All agent analyses completed!")
-            
-            # Step 3: Generate Final Recommendation
-            print("🎯 Step 3: Generating final recommendation and insights...")
-            combined_data = {
-                "breakdown": breakdown,
-                "market_analysis": market_data,
-                "competition": competitor_data,
-                "financial_projections": financial_data,
-                "risks": risk_data
-            }
-            
-            recommendation = await insight_agent.generate_recommendation(combined_data)
-            print(f"   ✅ Final score: {recommendation.get('score', 0)}/100")
-            print(f"   ✅ Verdict: {recommendation.get('verdict', 'Unknown')}")
-            
-            return {
-                "market_analysis": market_data,
-                "competition": competitor_data,
-                "financial_projections": financial_data,
-                "risks": risk_data,
-                "recommendation": recommendation
-            }
+            return await self._run_pipeline(idea, seed, deadline, on_section, breakdown, deep, fields, checkpoint, verbose=True)
             
         except Exception as e:
             print(f"❌ Comprehensive analysis failed: {e}")
@@ -91,57 +191,35 @@ class AnalysisOrchestrator:
             traceback.print_exc()
             raise e
 
-    async def _fallback_analysis(self, idea: str) -> Dict[str, Any]:
-        """Simple fallback analysis if comprehensive analysis fails"""
+    async def _fallback_analysis(self, idea: str, seed: Optional[str] = None,
+                                 deadline: Optional[Deadline] = None,
+                                 on_section: Optional[SectionCallback] = None,
+                                 breakdown: Optional[Dict[str, Any]] = None,
+                                 deep: bool = False,
+                                 fields: Optional[List[str]] = None,
+                                 checkpoint: Optional[DAGRun] = None) -> Dict[str, Any]:
+        """Simple fallback analysis if comprehensive analysis fails
+
+        Resumes the checkpoint, so only the sections that failed are attempted again.
+        """
+        checkpoint = checkpoint or DAGRun()
+        if checkpoint.values:
+            print(f"♻️ Reusing checkpointed sections: {', '.join(checkpoint.values)}")
         try:
-            breakdown = await self.breakdown_agent.analyze(idea)
-            
-            # Use the original simple agents as fallback
-            from .market_agent import MarketAnalysisAgent
-            from .competitor_agent import CompetitorAgent
-            from .financial_agent import FinancialAgent
-            from .risk_agent import RiskAgent
-            from .insight_agent import InsightAgent
-            
-            market_agent = MarketAnalysisAgent()
-            competitor_agent = CompetitorAgent()
-            financial_agent = FinancialAgent()
-            risk_agent = RiskAgent()
-            insight_agent = InsightAgent()
-            
-            # Run agents in parallel
-            tasks = [
-                market_agent.analyze(breakdown),
-                competitor_agent.analyze(breakdown),
-                financial_agent.analyze(breakdown),
-                risk_agent.analyze(breakdown)
-            ]
-            
-            market_data, competitor_data, financial_data, risk_data = await asyncio.gather(*tasks)
-            
-            # Generate insights
-            combined_data = {
-                "breakdown": breakdown,
-                "market_analysis": market_data,
-                "competition": competitor_data,
-                "financial_projections": financial_data,
-                "risks": risk_data
-            }
-            
-            recommendation = await insight_agent.generate_recommendation(combined_data)
-            
-            return {
-                "market_analysis": market_data,
-                "competition": competitor_data,
-                "financial_projections": financial_data,
-                "risks": risk_data,
-                "recommendation": recommendation
-            }
+            return await self._run_pipeline(idea, seed, deadline, on_section, breakdown, deep, fields, checkpoint)
             
         except Exception as e:
             print(f"Fallback analysis also failed: {e}")
-            return self._get_minimal_fallback()   
+            # Placeholders only for what is still missing; completed sections are kept
+            results = {**self._get_minimal_fallback(), **checkpoint.values}
+            results["degraded_sections"] = checkpoint.degraded + [
+                section for section in fields or RESPONSE_SECTIONS if section not in checkpoint.values
+            ]
+            return project_fields(results, fields)
  
+    async def aclose(self):
+        await self.portia_orchestrator.aclose()
+
     def _get_minimal_fallback(self) -> Dict[str, Any]:
         """Minimal fallback if all analysis fails"""
         return {
@@ -170,5 +248,6 @@ class AnalysisOrchestrator:
                 "score": 50,
                 "verdict": "Analysis Incomplete",
                 "key_insights": ["Please try the analysis again", "System temporarily unavailable"]
-            }
+            },
+            "tier": "minimal"
         }
\ No newline at end of file
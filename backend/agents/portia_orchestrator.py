@@ -1,9 +1,11 @@
 import os
-import asyncio
 from typing import Dict, Any, List
 import httpx
 import json
 from pydantic import BaseModel
+from .settings import load_environment
+from .circuit_breaker import CircuitBreaker
+from .analysis_graph import RESPONSE_SECTIONS, analysis_context, build_analysis_graph
 
 class PortiaAgent(BaseModel):
     """Portia AI Agent configuration"""
@@ -23,7 +25,13 @@ class PortiaTask(BaseModel):
 class PortiaOrchestrator:
     """Portia AI orchestrator for DataFoundry startup analysis"""
     
-    def __init__(self):
+    def __init__(self, agents: Any):
+        """agents provides breakdown_agent, market_agent, ... insight_agent for the local fallback
+
+        Normally the AnalysisOrchestrator, so the fallback shares its pooled clients, caches,
+        rate governors and circuit breakers instead of opening its own.
+        """
+        load_environment()
         self.api_key = os.getenv("PORTIA_API_KEY")
         self.base_url = "https://api.portia.dev/v1"
         self.client = httpx.AsyncClient(
@@ -33,9 +41,13 @@ class PortiaOrchestrator:
             },
             timeout=120.0
         )
+        # An unreachable Portia would otherwise cost the full client timeout on every request
+        self.breaker = CircuitBreaker.from_env("portia")
         
         # Define specialized agents
         self.agents = self._create_agents()
+        # Local agents used when Portia is unavailable
+        self.fallback_pipeline = build_analysis_graph(agents)
     
     def _create_agents(self) -> List[PortiaAgent]:
         """Create specialized Portia AI agents for startup analysis"""
@@ -195,20 +207,21 @@ class PortiaOrchestrator:
         """Execute the workflow using Portia AI API"""
         
         try:
-            # Create workflow execution request
-            response = await self.client.post(
-                f"{self.base_url}/workflows/execute",
-                json={
-                    "workflow": workflow,
-                    "timeout": 300  # 5 minutes
-                }
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                print(f"Portia API error: {response.status_code} - {response.text}")
-                raise Exception(f"Portia API returned {response.status_code}")
+            with self.breaker.guard():
+                # Create workflow execution request
+                response = await self.client.post(
+                    f"{self.base_url}/workflows/execute",
+                    json={
+                        "workflow": workflow,
+                        "timeout": 300  # 5 minutes
+                    }
+                )
+                
+                if response.status_code == 200:
+                    return response.json()
+                else:
+                    print(f"Portia API error: {response.status_code} - {response.text}")
+                    raise Exception(f"Portia API returned {response.status_code}")
                 
         except httpx.TimeoutException:
             print("Portia AI request timed out")
@@ -298,53 +311,10 @@ class PortiaOrchestrator:
     async def _fallback_analysis(self, idea: str) -> Dict[str, Any]:
         """Fallback analysis if Portia AI is unavailable"""
         
-        # Use the original simple agents as fallback
-        from .llm_breakdown_agent import LLMBreakdownAgent
-        from .market_agent import MarketAnalysisAgent
-        from .competitor_agent import CompetitorAgent
-        from .financial_agent import FinancialAgent
-        from .risk_agent import RiskAgent
-        from .insight_agent import InsightAgent
-        
         try:
-            breakdown_agent = LLMBreakdownAgent()
-            market_agent = MarketAnalysisAgent()
-            competitor_agent = CompetitorAgent()
-            financial_agent = FinancialAgent()
-            risk_agent = RiskAgent()
-            insight_agent = InsightAgent()
-            
-            # Get breakdown
-            breakdown = await breakdown_agent.analyze(idea)
-            
-            # Run agents in parallel
-            tasks = [
-                market_agent.analyze(breakdown),
-                competitor_agent.analyze(breakdown),
-                financial_agent.analyze(breakdown),
-                risk_agent.analyze(breakdown)
-            ]
-            
-            market_data, competitor_data, financial_data, risk_data = await asyncio.gather(*tasks)
-            
-            # Generate insights
-            combined_data = {
-                "breakdown": breakdown,
-                "market_analysis": market_data,
-                "competition": competitor_data,
-                "financial_projections": financial_data,
-                "risks": risk_data
-            }
-            
-            recommendation = await insight_agent.generate_recommendation(combined_data)
-            
-            return {
-                "market_analysis": market_data,
-                "competition": competitor_data,
-                "financial_projections": financial_data,
-                "risks": risk_data,
-                "recommendation": recommendation
-            }
+            # Use the original simple agents, run through the shared analysis graph
+            run = await self.fallback_pipeline.run(analysis_context(idea), targets=RESPONSE_SECTIONS)
+            return {section: run.values[section] for section in RESPONSE_SECTIONS}
             
         except Exception as e:
             print(f"Fallback analysis failed: {e}")
@@ -381,8 +351,11 @@ class PortiaOrchestrator:
             }
         }
     
+    async def aclose(self):
+        await self.client.aclose()
+    
     async def __aenter__(self):
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
\ No newline at end of file
+        await self.aclose()
\ No newline at end of file
@@ -0,0 +1,138 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+class RateLimited(Exception):
+    """Raised when a call cannot get a provider slot in time, or the provider pushed back"""
+
+class QueueTimeout(RateLimited):
+    """The call waited its full queue_timeout without being admitted (the provider was never hit)"""
+
+class RateGovernor:
+    """Token bucket plus concurrency cap for one outbound provider
+
+    Calls queue for a slot instead of firing immediately, so sustained throughput
+    stays just under the provider's per-minute budget rather than bursting into 429s.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float, max_concurrency: int,
+                 burst: Optional[int] = None, queue_timeout: Optional[float] = None,
+                 backoff_seconds: float = 10.0):
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.max_concurrency = max_concurrency
+        self.capacity = burst or max_concurrency
+        self.queue_timeout = queue_timeout
+        self.backoff_seconds = backoff_seconds
+
+        self._rate = requests_per_minute / 60.0
+        self._tokens = float(self.capacity)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # Token waiters are served one at a time, in arrival order
+        self._token_lock = asyncio.Lock()
+
+        self.admitted = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.waiting = 0
+        self.in_flight = 0
+        self.total_wait = 0.0
+
+    @classmethod
+    def from_env(cls, name: str, requests_per_minute: float, max_concurrency: int,
+                 queue_timeout: float) -> "RateGovernor":
+        """Build from <NAME>_RPM, <NAME>_MAX_CONCURRENCY, <NAME>_BURST and <NAME>_QUEUE_TIMEOUT"""
+        prefix = name.upper()
+        burst = os.getenv(f"{prefix}_BURST")
+        return cls(
+            name,
+            requests_per_minute=float(os.getenv(f"{prefix}_RPM", str(requests_per_minute))),
+            max_concurrency=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", str(max_concurrency))),
+            burst=int(burst) if burst else None,
+            queue_timeout=float(os.getenv(f"{prefix}_QUEUE_TIMEOUT", str(queue_timeout)))
+        )
+
+    @asynccontextmanager
+    async def slot(self, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """Hold one concurrency slot and one token for the duration of a provider call"""
+        await self.acquire(timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, timeout: Optional[float] = None):
+        """Wait for a slot and a token; pair with release() when the call is really over"""
+        timeout = timeout if timeout is not None else self.queue_timeout
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise QueueTimeout(f"{self.name} queue wait exceeded {timeout:.1f}s")
+        finally:
+            self.waiting -= 1
+
+        self.admitted += 1
+        self.total_wait += time.monotonic() - started
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    async def _acquire(self):
+        await self._semaphore.acquire()
+        try:
+            await self._take_token()
+        except BaseException:
+            # Timed out or cancelled while waiting for a token: give the slot back
+            self._semaphore.release()
+            raise
+
+    async def _take_token(self):
+        async with self._token_lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self._rate
+                await asyncio.sleep(wait)
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self._rate)
+        self._last_refill = now
+
+    def backoff(self, seconds: Optional[float] = None):
+        """The provider returned 429: drain the bucket and pause new calls"""
+        now = time.monotonic()
+        self._refill(now)
+        self._tokens = 0.0
+        self._paused_until = max(self._paused_until, now + (seconds or self.backoff_seconds))
+        self.throttled += 1
+        print(f"🚦 {self.name} rate limited by provider, pausing {seconds or self.backoff_seconds:.1f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        self._refill(now)
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "max_concurrency": self.max_concurrency,
+            "tokens": round(self._tokens, 2),
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "throttled": self.throttled,
+            "paused_for": round(max(0.0, self._paused_until - now), 2),
+            "avg_wait": round(self.total_wait / self.admitted, 3) if self.admitted else 0.0
+        }
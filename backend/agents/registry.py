@@ -0,0 +1,305 @@
+import asyncio
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from .analysis_graph import RESPONSE_SECTIONS
+from .orchestrator import AnalysisOrchestrator, PIPELINE_VERSION, ANALYSIS_MODES, SectionCallback, project_fields
+from .serpapi_client import SerpAPIClient
+from .gemini_client import GeminiClient
+from .singleflight import SingleFlight
+from .disk_cache import DiskCache
+from .gemini_cache import GeminiCache
+from .settings import cache_path, load_environment
+from .idea_key import normalize_idea, idea_hash, batch_group_key
+from .deadline import Deadline
+from .jobs import JobQueue
+from .admission import AdmissionController
+
+class AgentRegistry:
+    """Application-lifetime owner of the shared clients, agents and orchestrator"""
+
+    def __init__(self):
+        load_environment()
+        self.serpapi_cache = DiskCache(
+            cache_path("serpapi.sqlite3"),
+            table="serpapi",
+            max_entries=int(os.getenv("SERPAPI_CACHE_MAX_ENTRIES", "5000"))
+        )
+        self.serpapi_client = SerpAPIClient(cache=self.serpapi_cache)
+        self.gemini_cache = GeminiCache(
+            DiskCache(
+                cache_path("gemini.sqlite3"),
+                table="gemini",
+                max_entries=int(os.getenv("GEMINI_CACHE_MAX_ENTRIES", "5000"))
+            ),
+            ttl=float(os.getenv("GEMINI_CACHE_TTL", str(3 * 24 * 3600))),
+            max_memory_entries=int(os.getenv("GEMINI_CACHE_MEMORY_ENTRIES", "256"))
+        )
+        self.gemini_client = GeminiClient(cache=self.gemini_cache)
+        self.orchestrator = AnalysisOrchestrator(
+            serpapi_client=self.serpapi_client,
+            gemini_client=self.gemini_client
+        )
+        # Identical ideas analysed concurrently share one orchestrator run
+        self.analysis_flight = SingleFlight()
+        # Bounds concurrent full runs; overflow is served by the heuristic-only tier
+        self.admission = AdmissionController.from_env()
+        
+        # Whole-response cache, only meaningful for deterministic analyses
+        self.deterministic_default = os.getenv("DETERMINISTIC_MODE", "true").lower() == "true"
+        self.analysis_cache = DiskCache(
+            cache_path("analysis.sqlite3"),
+            table="analysis",
+            max_entries=int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "2000"))
+        )
+        self.analysis_cache_ttl = float(os.getenv("ANALYSIS_CACHE_TTL", str(6 * 3600)))
+        
+        # Bounds for POST /analyze/batch
+        self.batch_max_ideas = int(os.getenv("BATCH_MAX_IDEAS", "500"))
+        self.batch_concurrency = int(os.getenv("BATCH_CONCURRENCY", "8"))
+        
+        # Background analyses for POST /jobs, run through the same cache and coalescing path
+        self.jobs = JobQueue(
+            self._run_job,
+            workers=int(os.getenv("JOB_WORKERS", "4")),
+            max_queued=int(os.getenv("JOB_QUEUE_MAX", "100")),
+            result_ttl=float(os.getenv("JOB_RESULT_TTL", "3600"))
+        )
+
+    async def analyze(self, idea: str, deterministic: Optional[bool] = None,
+                      deadline: Optional[Deadline] = None, mode: str = "standard",
+                      fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Full analysis through the response cache and request coalescing
+
+        Coalesced callers share the deadline of whichever request started the run.
+        fields restricts the response (and the agents run) to those sections.
+        """
+        if deterministic is None:
+            deterministic = self.deterministic_default
+        
+        cached = await self._cached_result(idea, mode, fields) if deterministic else None
+        if cached is not None:
+            return cached
+        
+        results = await self.analysis_flight.do(
+            self._flight_key(idea, mode, deterministic, fields),
+            lambda: self._admitted_analysis(idea, mode, deterministic, deadline, fields=fields)
+        )
+        
+        if deterministic:
+            await self._store_result(idea, mode, results, fields)
+        return results
+
+    async def _admitted_analysis(self, idea: str, mode: str, deterministic: bool, deadline: Optional[Deadline],
+                                 on_section: Optional[SectionCallback] = None,
+                                 fields: Optional[List[str]] = None,
+                                 breakdown: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Run the requested mode, or the local heuristics when admission control sheds the request"""
+        if mode not in ANALYSIS_MODES:
+            raise ValueError(f"Unknown analysis mode: {mode}")
+        self.orchestrator.required_sections(fields)  # Reject unknown fields before taking a slot
+        if mode == "fast":
+            # Zero-network, so it never needs a pipeline slot
+            return await self.orchestrator.heuristic_analysis(idea, deterministic, on_section, tier="fast", fields=fields)
+        
+        async with self.admission.admit() as tier:
+            if tier == "degraded":
+                return await self.orchestrator.heuristic_analysis(idea, deterministic, on_section, fields=fields)
+            return await self.orchestrator.analyze_startup_idea(
+                idea, deterministic=deterministic, deadline=deadline, on_section=on_section,
+                breakdown=breakdown, deep=mode == "deep", fields=fields
+            )
+
+    @staticmethod
+    def _flight_key(idea: str, mode: str, deterministic: bool, fields: Optional[List[str]] = None) -> str:
+        return f"{mode}:{'det' if deterministic else 'rand'}:{','.join(sorted(fields or []))}:{normalize_idea(idea)}"
+
+    def _cache_key(self, idea: str, mode: str) -> str:
+        # Each mode has its own namespace so a fast result never answers a deep request, and
+        # results are kept apart by the settings that change them (GEMINI_FUSED_BREAKDOWN,
+        # COMPETITOR_DISCOVERY_MODE) so toggling either takes effect
+        variant = "+fused" if self.orchestrator.breakdown_agent.fused else ""
+        variant += f"+{self.orchestrator.competitor_agent.discovery_mode}"
+        return f"v{PIPELINE_VERSION}{variant}:{mode}:{idea_hash(idea)}"
+
+    async def _cached_result(self, idea: str, mode: str,
+                             fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Cached full response projected to fields, or None if it lacks one of them (e.g. breakdown)"""
+        cached = await asyncio.to_thread(self.analysis_cache.get, self._cache_key(idea, mode))
+        if cached is None or not set(fields or ()) <= cached.keys():
+            return None
+        return project_fields(cached, fields)
+
+    async def _store_result(self, idea: str, mode: str, results: Dict[str, Any],
+                            fields: Optional[List[str]] = None):
+        # Only full responses are cached; projections are cut from them on the way out
+        if fields is None and self.orchestrator.is_cacheable(results, mode):
+            await asyncio.to_thread(
+                self.analysis_cache.set, self._cache_key(idea, mode), results, self.analysis_cache_ttl
+            )
+
+    async def _run_job(self, idea: str, deterministic: Optional[bool] = None,
+                       deadline_ms: Optional[float] = None, mode: str = "standard",
+                       fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        # Arm the deadline when a worker picks the job up, so queueing time is not charged to it
+        return await self.analyze(
+            idea, deterministic=deterministic, deadline=Deadline.from_ms(deadline_ms), mode=mode, fields=fields
+        )
+
+    async def analyze_stream(self, idea: str, deterministic: Optional[bool] = None,
+                             deadline: Optional[Deadline] = None,
+                             mode: str = "standard",
+                             fields: Optional[List[str]] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """Yield (section, data) as each part of the analysis resolves, then ("result", full response)
+
+        Streams run their own pipeline rather than joining a coalesced /analyze run,
+        since a shared run cannot replay sections that resolved before a stream joined.
+        With fields, only those sections are streamed (their dependencies still run).
+        """
+        if deterministic is None:
+            deterministic = self.deterministic_default
+        
+        cached = await self._cached_result(idea, mode, fields) if deterministic else None
+        if cached is not None:
+            # Replay the sections a live run emits, not the tier/degradation metadata
+            for section in ("breakdown", *RESPONSE_SECTIONS):
+                if section in cached:
+                    yield section, cached[section]
+            yield "result", cached
+            return
+        
+        sections: asyncio.Queue = asyncio.Queue()
+        
+        async def on_section(section: str, data: Any):
+            if fields is None or section in fields:
+                await sections.put((section, data))
+        
+        task = asyncio.create_task(self._admitted_analysis(idea, mode, deterministic, deadline, on_section, fields))
+        # Sections are queued before the task finishes, so the sentinel always arrives last
+        task.add_done_callback(lambda _: sections.put_nowait(None))
+        try:
+            while (item := await sections.get()) is not None:
+                yield item
+            results = task.result()
+        finally:
+            # The client went away mid-stream; stop paying for the remaining sections
+            if not task.done():
+                task.cancel()
+        
+        if deterministic:
+            await self._store_result(idea, mode, results, fields)
+        yield "result", results
+
+    async def analyze_batch(self, ideas: List[str], deterministic: Optional[bool] = None,
+                            deadline_ms: Optional[float] = None,
+                            mode: str = "standard",
+                            fields: Optional[List[str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Analyse many ideas, yielding {"index", "idea", ...} records in completion order
+
+        Breakdowns run first with bounded concurrency, once per distinct idea. Ideas are
+        then grouped by the industry/keyword set their searches are built from and
+        scheduled group by group, so each group's SerpAPI queries are issued once and
+        shared in flight or via cache. Each run goes through admission control and
+        request coalescing like /analyze, so duplicates share one pipeline and a
+        failing idea becomes an "error" record instead of ending the batch.
+        """
+        if deterministic is None:
+            deterministic = self.deterministic_default
+        
+        limit = asyncio.Semaphore(self.batch_concurrency)
+        records: asyncio.Queue = asyncio.Queue()
+        
+        async def breakdown_for(key: str, idea: str):
+            try:
+                async with limit:
+                    return key, await self.orchestrator.breakdown_agent.analyze(idea)
+            except Exception as e:
+                return key, e
+        
+        async def run(index: int, idea: str, breakdown: Dict[str, Any], group: str):
+            try:
+                async with limit:
+                    # Each idea's budget starts when it gets a slot, not when the batch arrived
+                    results = await self.analysis_flight.do(
+                        self._flight_key(idea, mode, deterministic, fields),
+                        lambda: self._admitted_analysis(
+                            idea, mode, deterministic, Deadline.from_ms(deadline_ms),
+                            fields=fields, breakdown=breakdown
+                        )
+                    )
+                if deterministic:
+                    await self._store_result(idea, mode, results, fields)
+                await records.put({"index": index, "idea": idea, "group": group, "result": results})
+            except Exception as e:
+                await records.put({"index": index, "idea": idea, "group": group, "error": str(e)})
+        
+        if mode == "fast":
+            # No searches to share, so there is nothing to group
+            for index, idea in enumerate(ideas):
+                results = await self.orchestrator.heuristic_analysis(idea, deterministic, tier="fast", fields=fields)
+                yield {"index": index, "idea": idea, "group": None, "result": results}
+            return
+        
+        # Deterministic cache hits are returned straight away and skip grouping
+        pending = []
+        for index, idea in enumerate(ideas):
+            cached = await self._cached_result(idea, mode, fields) if deterministic else None
+            if cached is not None:
+                yield {"index": index, "idea": idea, "group": None, "result": cached}
+            else:
+                pending.append((index, idea))
+        if not pending:
+            return
+        
+        distinct = {normalize_idea(idea): idea for _, idea in pending}
+        breakdowns = dict(await asyncio.gather(*(breakdown_for(key, idea) for key, idea in distinct.items())))
+        groups: Dict[Tuple[str, Tuple[str, ...]], List[Tuple[int, str]]] = {}
+        for index, idea in pending:
+            breakdown = breakdowns[normalize_idea(idea)]
+            if isinstance(breakdown, Exception):
+                yield {"index": index, "idea": idea, "group": None, "error": str(breakdown)}
+            else:
+                groups.setdefault(batch_group_key(breakdown), []).append((index, idea))
+        print(f"📦 Batch of {len(ideas)} ideas: {len(distinct)} distinct to analyse in {len(groups)} search groups")
+        
+        # Tasks are created group by group so members of a group run side by side
+        tasks = [
+            asyncio.create_task(run(index, idea, breakdowns[normalize_idea(idea)], " ".join([industry, *keywords])))
+            for (industry, keywords), members in groups.items()
+            for index, idea in members
+        ]
+        try:
+            for _ in tasks:
+                yield await records.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "analyze_coalescing": self.analysis_flight.stats(),
+            "admission": self.admission.stats(),
+            "pipeline_nodes": self.orchestrator.pipeline.stats(),
+            "serpapi_cache": self.serpapi_cache.stats(),
+            "gemini_cache": self.gemini_cache.stats(),
+            "analysis_cache": self.analysis_cache.stats(),
+            "serpapi_coalescing": self.serpapi_client.flight.stats(),
+            "serpapi_prefetch": self.serpapi_client.prefetch_stats(),
+            "rate_governors": {
+                "gemini": self.gemini_client.stats(),
+                "serpapi": self.serpapi_client.governor.stats()
+            },
+            "circuit_breakers": {
+                "gemini": self.gemini_client.breaker.stats(),
+                "serpapi": self.serpapi_client.breaker.stats(),
+                "portia": self.orchestrator.portia_orchestrator.breaker.stats()
+            },
+            "jobs": self.jobs.stats()
+        }
+
+    async def aclose(self):
+        """Release every pooled connection and executor on shutdown"""
+        await self.jobs.aclose()
+        await self.orchestrator.aclose()
+        await self.serpapi_client.aclose()
+        await self.gemini_client.aclose()
+        self.analysis_cache.close()
@@ -1,14 +1,13 @@
 import asyncio
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 import random
-import requests
-import os
-from dotenv import load_dotenv
+from .serpapi_client import SerpAPIClient
 
 class RiskAgent:
-    def __init__(self):
-        load_dotenv()
-        self.serpapi_key = os.getenv("SERPAPI_KEY")
+    BREAKDOWN_FIELDS = ("industry", "business_model", "regulatory_considerations", "keywords")
+
+    def __init__(self, serpapi_client: Optional[SerpAPIClient] = None):
+        self.serpapi = serpapi_client or SerpAPIClient()
         
         # Dynamic risk categories and templates
         self.risk_templates = {
@@ -82,7 +81,9 @@ class RiskAgent:
             ]
         }
 
-    async def analyze(self, breakdown: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def analyze(self, breakdown: Dict[str, Any], rng: Optional[random.Random] = None,
+                      deep: bool = False) -> List[Dict[str, Any]]:
+        rng = rng or random.Random()
         industry = breakdown.get("industry", "Technology").lower()
         business_model = breakdown.get("business_model", "")
         regulatory_considerations = breakdown.get("regulatory_considerations", [])
@@ -90,16 +91,16 @@ class RiskAgent:
         
         try:
             # Fetch real-time risk data
-            real_risks = await self._fetch_real_risk_data(industry, keywords, business_model)
+            real_risks = await self._fetch_real_risk_data(industry, keywords, business_model, rng, deep)
             
             # Get industry-specific risks with variation
-            base_risks = self._get_dynamic_industry_risks(industry, keywords)
+            base_risks = self._get_dynamic_industry_risks(industry, keywords, rng)
             
             # Add business model specific risks with variation
             model_risks = self._get_dynamic_business_model_risks(business_model, industry)
             
             # Add regulatory risks with current context
-            regulatory_risks = self._get_dynamic_regulatory_risks(regulatory_considerations, industry)
+            regulatory_risks = self._get_dynamic_regulatory_risks(regulatory_considerations, industry, rng)
             
             # Combine all risks
             all_risks = real_risks + base_risks + model_risks + regulatory_risks
@@ -111,38 +112,52 @@ class RiskAgent:
             
         except Exception as e:
             print(f"Risk analysis error: {e}")
-            return self._get_fallback_risks(industry, business_model)
+            return self._get_fallback_risks(industry, business_model, rng)
+
+    def search_requests(self, breakdown: Dict[str, Any], deep: bool = False) -> List[Tuple[Dict[str, Any], str]]:
+        """The SerpAPI searches analyze() issues for this breakdown, as (params, query_type)"""
+        industry = breakdown.get("industry", "Technology").lower()
+        return [(self._risk_params(industry, breakdown.get("keywords", []), deep), "risk")]
+
+    async def fallback_analysis(self, breakdown: Dict[str, Any], rng: Optional[random.Random] = None) -> List[Dict[str, Any]]:
+        """Template-based risks only, no network calls"""
+        rng = rng or random.Random()
+        industry = breakdown.get("industry", "Technology").lower()
+        business_model = breakdown.get("business_model", "")
+        
+        return self._get_fallback_risks(industry, business_model, rng)
+
+    def _risk_params(self, industry: str, keywords: list, deep: bool = False) -> Dict[str, Any]:
+        # Search for recent industry risks and challenges
+        search_terms = [industry] + keywords[:2]
+        query = f"{' '.join(search_terms)} risks challenges problems 2024"
+        
+        return {
+            "engine": "google",
+            "q": query,
+            "num": 10 if deep else 5,
+            "tbm": "nws"  # News search
+        }
 
-    async def _fetch_real_risk_data(self, industry: str, keywords: list, business_model: str) -> List[Dict[str, Any]]:
+    async def _fetch_real_risk_data(self, industry: str, keywords: list, business_model: str,
+                                    rng: random.Random, deep: bool = False) -> List[Dict[str, Any]]:
         """Fetch real-time risk data from news and industry reports"""
-        if not self.serpapi_key:
+        if not self.serpapi.enabled:
             return []
         
         try:
-            # Search for recent industry risks and challenges
-            search_terms = [industry] + keywords[:2]
-            query = f"{' '.join(search_terms)} risks challenges problems 2024"
-            
-            params = {
-                "engine": "google",
-                "q": query,
-                "api_key": self.serpapi_key,
-                "num": 5,
-                "tbm": "nws"  # News search
-            }
-            
-            response = requests.get("https://serpapi.com/search", params=params, timeout=10)
-            data = response.json()
+            data = await self.serpapi.search(self._risk_params(industry, keywords, deep), query_type="risk")
             
             # Extract risks from news results
-            risks = self._extract_risks_from_news(data, industry)
+            risks = self._extract_risks_from_news(data, industry, rng, scan=8 if deep else 3)
             return risks
             
         except Exception as e:
             print(f"Failed to fetch real risk data: {e}")
             return []
 
-    def _extract_risks_from_news(self, search_data: dict, industry: str) -> List[Dict[str, Any]]:
+    def _extract_risks_from_news(self, search_data: dict, industry: str, rng: random.Random,
+                                 scan: int = 3) -> List[Dict[str, Any]]:
         """Extract risk information from news search results"""
         risks = []
         news_results = search_data.get("news_results", [])
@@ -155,7 +170,7 @@ class RiskAgent:
             "financial": ["funding", "investment", "cash", "revenue", "loss"]
         }
         
-        for result in news_results[:3]:
+        for result in news_results[:scan]:
             title = result.get("title", "").lower()
             snippet = result.get("snippet", "").lower()
             text = f"{title} {snippet}"
@@ -163,7 +178,7 @@ class RiskAgent:
             for risk_type, keywords in risk_keywords.items():
                 if any(keyword in text for keyword in keywords):
                     # Generate risk based on news content
-                    risk_level = self._determine_risk_level(text, risk_type)
+                    risk_level = self._determine_risk_level(text, risk_type, rng)
                     description = self._generate_risk_description(text, risk_type, industry)
                     
                     risks.append({
@@ -175,7 +190,7 @@ class RiskAgent:
         
         return risks
 
-    def _determine_risk_level(self, text: str, risk_type: str) -> str:
+    def _determine_risk_level(self, text: str, risk_type: str, rng: random.Random) -> str:
         """Determine risk level based on text content"""
         high_indicators = ["crisis", "major", "significant", "severe", "critical", "urgent"]
         medium_indicators = ["concern", "challenge", "issue", "problem", "difficulty"]
@@ -185,7 +200,7 @@ class RiskAgent:
         elif any(indicator in text for indicator in medium_indicators):
             return "Medium"
         else:
-            return random.choice(["Low", "Medium"])
+            return rng.choice(["Low", "Medium"])
 
     def _generate_risk_description(self, text: str, risk_type: str, industry: str) -> str:
         """Generate contextual risk description"""
@@ -199,7 +214,7 @@ class RiskAgent:
         
         return descriptions.get(risk_type, f"Industry-specific challenges in {industry} require careful monitoring")
 
-    def _get_dynamic_industry_risks(self, industry: str, keywords: list) -> List[Dict[str, Any]]:
+    def _get_dynamic_industry_risks(self, industry: str, keywords: list, rng: random.Random) -> List[Dict[str, Any]]:
         """Generate dynamic industry-specific risks with variation"""
         base_risks = self._get_industry_risks(industry)
         # Add variation to base risks
@@ -207,20 +222,20 @@ class RiskAgent:
         for risk in base_risks:
             # Vary risk levels slightly
             original_level = risk["level"]
-            if random.random() < 0.3:  # 30% chance to vary
+            if rng.random() < 0.3:  # 30% chance to vary
                 if original_level == "High":
-                    new_level = random.choice(["High", "Medium"])
+                    new_level = rng.choice(["High", "Medium"])
                 elif original_level == "Medium":
-                    new_level = random.choice(["Medium", "Low", "High"])
+                    new_level = rng.choice(["Medium", "Low", "High"])
                 else:
-                    new_level = random.choice(["Low", "Medium"])
+                    new_level = rng.choice(["Low", "Medium"])
             else:
                 new_level = original_level
             
             # Add keyword-specific context
             description = risk["description"]
             if keywords:
-                relevant_keyword = random.choice(keywords)
+                relevant_keyword = rng.choice(keywords)
                 if relevant_keyword.lower() not in description.lower():
                     description += f" This is particularly relevant for {relevant_keyword}-focused businesses."
             
@@ -302,7 +317,8 @@ class RiskAgent:
         
         return risks
 
-    def _get_dynamic_regulatory_risks(self, regulatory_considerations: List[str], industry: str) -> List[Dict[str, Any]]:
+    def _get_dynamic_regulatory_risks(self, regulatory_considerations: List[str], industry: str,
+                                      rng: random.Random) -> List[Dict[str, Any]]:
         """Generate dynamic regulatory risks with current context"""
         base_risks = self._get_regulatory_risks(regulatory_considerations)
         
@@ -324,11 +340,11 @@ class RiskAgent:
             
             # Vary risk levels based on current regulatory climate
             level = risk["level"]
-            if random.random() < 0.4:  # 40% chance to adjust
+            if rng.random() < 0.4:  # 40% chance to adjust
                 if level == "Medium":
-                    level = random.choice(["Medium", "High"])
+                    level = rng.choice(["Medium", "High"])
                 elif level == "High":
-                    level = random.choice(["High", "Medium"])
+                    level = rng.choice(["High", "Medium"])
             
             enhanced_risks.append({
                 "category": risk["category"],
@@ -378,21 +394,21 @@ class RiskAgent:
         
         return unique_risks
 
-    def _get_fallback_risks(self, industry: str, business_model: str) -> List[Dict[str, Any]]:
+    def _get_fallback_risks(self, industry: str, business_model: str, rng: random.Random) -> List[Dict[str, Any]]:
         """Fallback risks if real data fetching fails"""
         base_risks = self._get_industry_risks(industry)
         model_risks = self._get_business_model_risks(business_model)
         
-        # Add some randomization to fallback risks
-        all_risks = base_risks + model_risks
+        # Add some randomization to fallback risks (on copies, the templates are shared)
+        all_risks = [dict(risk) for risk in base_risks + model_risks]
         for risk in all_risks:
-            if random.random() < 0.3:  # 30% chance to vary level
+            if rng.random() < 0.3:  # 30% chance to vary level
                 current_level = risk["level"]
                 if current_level == "High":
-                    risk["level"] = random.choice(["High", "Medium"])
+                    risk["level"] = rng.choice(["High", "Medium"])
                 elif current_level == "Medium":
-                    risk["level"] = random.choice(["Medium", "Low", "High"])
+                    risk["level"] = rng.choice(["Medium", "Low", "High"])
                 else:
-                    risk["level"] = random.choice(["Low", "Medium"])
+                    risk["level"] = rng.choice(["Low", "Medium"])
         
         return all_risks[:5]
\ No newline at end of file
@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import json
+import os
+from typing import Dict, Any, Iterable, Optional, Tuple
+import httpx
+from .settings import load_environment
+from .disk_cache import DiskCache
+from .singleflight import SingleFlight
+from .rate_governor import RateGovernor, RateLimited, QueueTimeout
+from .circuit_breaker import CircuitBreaker
+
+# Default cache lifetimes per query type, in seconds (override with SERPAPI_CACHE_TTL_<TYPE>)
+DEFAULT_CACHE_TTLS = {
+    "market": 24 * 3600,
+    "competitors": 24 * 3600,
+    "risk": 6 * 3600,  # News results go stale faster
+    "default": 12 * 3600
+}
+
+class SerpAPIClient:
+    """Shared async SerpAPI client with a pooled, keep-alive connection"""
+
+    BASE_URL = "https://serpapi.com/search"
+
+    def __init__(self, api_key: Optional[str] = None, timeout: float = 10.0, max_connections: int = 20,
+                 cache: Optional[DiskCache] = None, governor: Optional[RateGovernor] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        load_environment()
+        self.api_key = api_key if api_key is not None else os.getenv("SERPAPI_KEY")
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            )
+        )
+        self.cache = cache
+        self.governor = governor or RateGovernor.from_env(
+            "serpapi", requests_per_minute=100, max_concurrency=max_connections, queue_timeout=15
+        )
+        self.breaker = breaker or CircuitBreaker.from_env("serpapi")
+        # Identical searches issued concurrently (e.g. ideas in one batch group) share one request
+        self.flight = SingleFlight()
+        self.prefetched = 0
+        self.prefetch_used = 0
+        self.prefetch_discarded = 0
+        self.cache_ttls = {
+            query_type: float(os.getenv(f"SERPAPI_CACHE_TTL_{query_type.upper()}", ttl))
+            for query_type, ttl in DEFAULT_CACHE_TTLS.items()
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_key)
+
+    async def search(self, params: Dict[str, Any], query_type: str = "default") -> Dict[str, Any]:
+        """Run a SerpAPI search without blocking the event loop, serving repeats from cache"""
+        if not self.api_key:
+            raise Exception("SerpAPI key not available")
+
+        cache_key = self.cache_key(params)
+        return await self.flight.do(cache_key, lambda: self._search(params, query_type, cache_key))
+
+    def prefetch(self, requests: Iterable[Tuple[Dict[str, Any], str]]) -> Dict[str, asyncio.Task]:
+        """Start searches speculatively; an identical search() later joins them in flight or hits the cache
+
+        Returns the running searches by cache key, to be settled with claim().
+        """
+        if not self.api_key:
+            return {}
+        tasks = {}
+        for params, query_type in requests:
+            task = asyncio.ensure_future(self.search(params, query_type))
+            # A failed guess is not an error; the real search reports its own failures
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            tasks[self.cache_key(params)] = task
+        self.prefetched += len(tasks)
+        return tasks
+
+    def claim(self, prefetched: Dict[str, asyncio.Task], requests: Iterable[Tuple[Dict[str, Any], str]]):
+        """Keep the prefetched searches these requests will reuse and cancel the rest"""
+        wanted = {self.cache_key(params) for params, _ in requests}
+        for cache_key, task in prefetched.items():
+            if cache_key in wanted:
+                self.prefetch_used += 1
+            else:
+                self.prefetch_discarded += 1
+                task.cancel()
+
+    def prefetch_stats(self) -> Dict[str, Any]:
+        return {
+            "prefetched": self.prefetched,
+            "used": self.prefetch_used,
+            "discarded": self.prefetch_discarded,
+            "hit_ratio": round(self.prefetch_used / self.prefetched, 3) if self.prefetched else 0.0
+        }
+
+    async def _search(self, params: Dict[str, Any], query_type: str, cache_key: str) -> Dict[str, Any]:
+        if self.cache:
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                return cached
+
+        # Only real outbound requests spend rate budget or probe the breaker; cache hits above are free
+        with self.breaker.guard(ignore=(QueueTimeout,)):
+            async with self.governor.slot():
+                response = await self.client.get(self.BASE_URL, params={**params, "api_key": self.api_key})
+            if response.status_code == 429:
+                retry_after = response.headers.get("retry-after")
+                self.governor.backoff(float(retry_after) if retry_after and retry_after.isdigit() else None)
+                raise RateLimited("SerpAPI rate limit reached")
+            if response.status_code >= 500:
+                raise Exception(f"SerpAPI returned {response.status_code}")
+        data = response.json()
+
+        # Only successful searches are worth keeping
+        if self.cache and response.status_code == 200 and "error" not in data:
+            ttl = self.cache_ttls.get(query_type, self.cache_ttls["default"])
+            await asyncio.to_thread(self.cache.set, cache_key, data, ttl)
+        return data
+
+    @staticmethod
+    def cache_key(params: Dict[str, Any]) -> str:
+        """Stable key from engine + query + remaining params (never the API key)"""
+        material = {k: v for k, v in params.items() if k != "api_key"}
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()
+
+    async def aclose(self):
+        await self.client.aclose()
+        if self.cache:
+            self.cache.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
@@ -0,0 +1,16 @@
+import os
+from functools import lru_cache
+from dotenv import load_dotenv
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@lru_cache(maxsize=None)
+def load_environment() -> None:
+    """Load backend/.env once per process instead of on every agent construction"""
+    load_dotenv()
+
+def cache_path(filename: str) -> str:
+    """Location of an on-disk cache file (DATAFOUNDRY_CACHE_DIR, default backend/.cache)"""
+    load_environment()
+    cache_dir = os.getenv("DATAFOUNDRY_CACHE_DIR", os.path.join(BACKEND_DIR, ".cache"))
+    return os.path.join(cache_dir, filename)
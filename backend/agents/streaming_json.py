@@ -0,0 +1,123 @@
+import asyncio
+import json
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+class IncrementalJSONObject:
+    """Parses one JSON object as its text arrives, releasing each top-level field once complete
+
+    Text before the opening brace (e.g. a ```json fence) and after the closing one is ignored.
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.complete = False
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._member_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> Dict[str, Any]:
+        """Consume more text and return the fields it completed"""
+        self._buffer += chunk
+        completed: Dict[str, Any] = {}
+        while self._pos < len(self._buffer) and not self.complete:
+            char = self._buffer[self._pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._member_start = self._pos + 1
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.update(self._close_member())
+                    self.complete = True
+            elif char == "," and self._depth == 1:
+                completed.update(self._close_member())
+                self._member_start = self._pos + 1
+            self._pos += 1
+        self.fields.update(completed)
+        return completed
+
+    def _close_member(self) -> Dict[str, Any]:
+        member = self._buffer[self._member_start:self._pos].strip()
+        if not member:
+            return {}
+        # json.JSONDecodeError is a ValueError subclass
+        return json.loads("{" + member + "}")
+
+    def result(self) -> Dict[str, Any]:
+        if not self.complete:
+            raise ValueError("JSON object ended before its closing brace")
+        return dict(self.fields)
+
+class PartialResult:
+    """A dict filled in field by field; waiters resume as soon as the fields they need are in"""
+
+    def __init__(self, fields: Optional[Dict[str, Any]] = None):
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        # Task filling this result, if any; complete() awaits it so cancellation reaches it
+        self.producer: Optional[asyncio.Task] = None
+        self._waiters: List[Tuple[Set[str], asyncio.Future]] = []
+        if fields is not None:
+            self.finish(fields)
+
+    def update(self, fields: Dict[str, Any]):
+        if self.done or not fields:
+            return
+        self.fields.update(fields)
+        self._wake()
+
+    def finish(self, fields: Optional[Dict[str, Any]] = None):
+        """No more fields are coming; fields, if given, is the authoritative final value"""
+        if self.done:
+            return
+        if fields is not None:
+            self.fields.update(fields)
+        self.done = True
+        self._wake()
+
+    def settle(self, fallback: Dict[str, Any]) -> Dict[str, Any]:
+        """Finish with fallback filling whatever has not arrived, keeping fields already handed out"""
+        self.finish({**fallback, **self.fields})
+        return dict(self.fields)
+
+    async def complete(self) -> Dict[str, Any]:
+        """Every field, once the producer has finished"""
+        # A producer cancelled by an earlier, failed run has already settled the fields
+        if self.producer is not None and not self.producer.done():
+            await self.producer
+        return dict(self.fields)
+
+    async def wait_for(self, names: Iterable[str]) -> Dict[str, Any]:
+        """The named fields, once all have arrived (or, after finish(), those that exist)"""
+        names = set(names)
+        if not self._ready(names):
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append((names, future))
+            try:
+                await future
+            finally:
+                self._waiters = [(n, f) for n, f in self._waiters if f is not future]
+        return {name: self.fields[name] for name in names if name in self.fields}
+
+    def _ready(self, names: Set[str]) -> bool:
+        return self.done or names <= self.fields.keys()
+
+    def _wake(self):
+        for names, future in self._waiters:
+            if not future.done() and self._ready(names):
+                future.set_result(None)
@@ -1,13 +1,56 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Header, Request
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from typing import Any, Awaitable, List, Literal, Optional
+import asyncio
+import json
 import os
 from dotenv import load_dotenv
-from agents.orchestrator import AnalysisOrchestrator
+from agents.registry import AgentRegistry
+from agents.deadline import Deadline
+from agents.jobs import JobQueueFull
+from agents.admission import Overloaded
 
 load_dotenv()
 
-app = FastAPI(title="DataFoundry API", version="1.0.0")
+# Default per-request budget in milliseconds; unset means no deadline
+DEFAULT_DEADLINE_MS = float(os.getenv("ANALYZE_DEADLINE_MS") or 0) or None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Clients, agents and the orchestrator are built once and shared by every request
+    app.state.registry = AgentRegistry()
+    try:
+        yield
+    finally:
+        await app.state.registry.aclose()
+
+app = FastAPI(title="DataFoundry API", version="1.0.0", lifespan=lifespan)
+
+class ClientDisconnected(Exception):
+    """The caller went away before its response was ready"""
+
+async def cancel_on_disconnect(request: Request, work: Awaitable[Any]) -> Any:
+    """Await work, cancelling it (and every agent call under it) if the client disconnects"""
+    task = asyncio.ensure_future(work)
+    
+    async def watch():
+        # The body is already read, so the next ASGI message is the disconnect
+        while (await request.receive())["type"] != "http.disconnect":
+            pass
+        task.cancel()
+    
+    watcher = asyncio.create_task(watch())
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if watcher.done():
+            raise ClientDisconnected()
+        raise
+    finally:
+        watcher.cancel()
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,22 +60,123 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+AnalysisField = Literal["breakdown", "market_analysis", "competition", "financial_projections", "risks", "recommendation"]
+
 class IdeaRequest(BaseModel):
     idea: str
+    # None uses DETERMINISTIC_MODE; deterministic results are served from the response cache
+    deterministic: Optional[bool] = None
+    # Time budget; sections that miss it are filled locally and listed in degraded_sections
+    deadline_ms: Optional[int] = None
+    # fast: local heuristics (<50 ms); standard: cached multi-agent pipeline; deep: wider research + narrative
+    mode: Literal["fast", "standard", "deep"] = "standard"
+    # Only compute and return these sections (plus whatever they depend on); None returns all
+    fields: Optional[List[AnalysisField]] = None
+
+class BatchRequest(BaseModel):
+    ideas: List[str]
+    deterministic: Optional[bool] = None
+    deadline_ms: Optional[int] = None
+    mode: Literal["fast", "standard", "deep"] = "standard"
+    fields: Optional[List[AnalysisField]] = None
 
 @app.post("/analyze")
-async def analyze_idea(request: IdeaRequest):
+async def analyze_idea(request: IdeaRequest, http_request: Request,
+                       x_deadline_ms: Optional[int] = Header(None, alias="X-Deadline-Ms")):
+    deadline = Deadline.from_ms(request.deadline_ms or x_deadline_ms or DEFAULT_DEADLINE_MS)
     try:
-        orchestrator = AnalysisOrchestrator()
-        results = await orchestrator.analyze_startup_idea(request.idea)
+        results = await cancel_on_disconnect(http_request, app.state.registry.analyze(
+            request.idea, deterministic=request.deterministic, deadline=deadline, mode=request.mode,
+            fields=request.fields
+        ))
         return results
+    except ClientDisconnected:
+        # Nobody is left to read it; 499 is the conventional "client closed request" status
+        return Response(status_code=499)
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/analyze/stream")
+async def analyze_idea_stream(request: IdeaRequest, x_deadline_ms: Optional[int] = Header(None, alias="X-Deadline-Ms")):
+    """Server-Sent Events: one event per section as it completes, then `result` with the full response"""
+    deadline = Deadline.from_ms(request.deadline_ms or x_deadline_ms or DEFAULT_DEADLINE_MS)
+    
+    async def events():
+        try:
+            async for section, data in app.state.registry.analyze_stream(
+                request.idea, deterministic=request.deterministic, deadline=deadline, mode=request.mode,
+                fields=request.fields
+            ):
+                yield f"event: {section}\ndata: {json.dumps(data)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream until it completes
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/analyze/batch")
+async def analyze_batch(request: BatchRequest, x_deadline_ms: Optional[int] = Header(None, alias="X-Deadline-Ms")):
+    """NDJSON: one {"index", "idea", "group", "result" | "error"} line per idea as it completes"""
+    registry = app.state.registry
+    if len(request.ideas) > registry.batch_max_ideas:
+        raise HTTPException(status_code=413, detail=f"At most {registry.batch_max_ideas} ideas per batch")
+    # The deadline bounds each idea's pipeline, not the batch as a whole
+    deadline_ms = request.deadline_ms or x_deadline_ms or DEFAULT_DEADLINE_MS
+    
+    async def lines():
+        async for record in registry.analyze_batch(
+            request.ideas, deterministic=request.deterministic, deadline_ms=deadline_ms, mode=request.mode,
+            fields=request.fields
+        ):
+            yield json.dumps(record) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: IdeaRequest, x_deadline_ms: Optional[int] = Header(None, alias="X-Deadline-Ms")):
+    deadline_ms = request.deadline_ms or x_deadline_ms or DEFAULT_DEADLINE_MS
+    try:
+        job = app.state.registry.jobs.submit(
+            request.idea, deterministic=request.deterministic, deadline_ms=deadline_ms, mode=request.mode,
+            fields=request.fields
+        )
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {"id": job.id, "status": job.status}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = app.state.registry.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job.to_dict()
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    job = app.state.registry.jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return {"id": job.id, "status": job.status}
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+async def metrics():
+    return app.state.registry.metrics()
+
+@app.delete("/cache/gemini")
+async def clear_gemini_cache():
+    await app.state.registry.gemini_cache.clear()
+    return {"status": "cleared"}
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Side-by-side benchmark of the two-call and fused (GEMINI_FUSED_BREAKDOWN) Gemini paths
+"""
+import sys
+import os
+import time
+import asyncio
+import statistics
+from datetime import datetime
+
+# Add backend to path
+sys.path.append('backend')
+
+IDEAS = [
+    "AI-powered social media content creation tool for small businesses",
+    "Drone delivery service for medical supplies in rural areas",
+    "Blockchain-based supply chain tracking for food safety",
+    "Virtual reality fitness platform for home workouts",
+    "Peer-to-peer car sharing app for urban areas"
+]
+
+PATHS = {"two-call": "false", "fused": "true"}
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def benchmark_path(fused: str):
+    """Cold standard-mode analyses of every idea; returns latencies (ms) and Gemini calls per idea"""
+    from backend.agents.registry import AgentRegistry
+
+    # Agents read the flag when they are built, so each path gets its own registry
+    os.environ["GEMINI_FUSED_BREAKDOWN"] = fused
+    registry = AgentRegistry()
+    # Empty every cache so each idea pays its full Gemini and SerpAPI cost
+    registry.analysis_cache.clear()
+    registry.serpapi_cache.clear()
+    await registry.gemini_cache.clear()
+
+    latencies, calls = [], []
+    try:
+        for idea in IDEAS:
+            before = registry.gemini_client.stats()["admitted"]
+            start = time.perf_counter()
+            result = await registry.analyze(idea, deterministic=True)
+            latencies.append((time.perf_counter() - start) * 1000)
+            calls.append(registry.gemini_client.stats()["admitted"] - before)
+
+            competitors = [comp["name"] for comp in result["competition"]["direct_competitors"]]
+            print(f"   {idea[:50]:<50} {latencies[-1]:8.1f} ms | gemini calls {calls[-1]} | {', '.join(competitors[:3])}")
+    finally:
+        await registry.aclose()
+    return latencies, calls
+
+async def benchmark_fused():
+    try:
+        from dotenv import load_dotenv
+
+        # Load environment variables
+        load_dotenv('backend/.env')
+
+        print("⏱️  BENCHMARKING TWO-CALL VS FUSED GEMINI BREAKDOWN")
+        print("=" * 80)
+        print(f"⏰ Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"🔍 Competitor discovery mode: {os.getenv('COMPETITOR_DISCOVERY_MODE', 'sequential')}")
+        print("=" * 80)
+
+        summary = {}
+        for path, fused in PATHS.items():
+            print(f"\n🔍 PATH: {path}")
+            print("-" * 60)
+            summary[path] = await benchmark_path(fused)
+
+        # Summary comparison
+        print("\n" + "=" * 80)
+        print("📊 COLD LATENCY (ms) AND GEMINI CALLS PER ANALYSIS")
+        print("=" * 80)
+        print(f"{'path':<10} {'p50':>10} {'p95':>10} {'max':>10} {'calls/idea':>12}")
+        for path, (latencies, calls) in summary.items():
+            print(f"{path:<10} {statistics.median(latencies):>10.1f} {percentile(latencies, 95):>10.1f} "
+                  f"{max(latencies):>10.1f} {statistics.mean(calls):>12.2f}")
+
+        two_call, fused = summary["two-call"], summary["fused"]
+        delta_ms = statistics.median(fused[0]) - statistics.median(two_call[0])
+        saved_calls = sum(two_call[1]) - sum(fused[1])
+        print(f"\n   Fused path: p50 {delta_ms:+.1f} ms vs two-call, {saved_calls} fewer Gemini calls over {len(IDEAS)} ideas")
+        return saved_calls > 0
+
+    except Exception as e:
+        print(f"❌ Benchmark failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = asyncio.run(benchmark_fused())
+    sys.exit(0 if success else 1)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for the fast / standard / deep analysis modes
+"""
+import sys
+import time
+import asyncio
+import statistics
+from datetime import datetime
+
+# Add backend to path
+sys.path.append('backend')
+
+IDEAS = [
+    "AI-powered social media content creation tool for small businesses",
+    "Drone delivery service for medical supplies in rural areas",
+    "Blockchain-based supply chain tracking for food safety",
+    "Virtual reality fitness platform for home workouts",
+    "Peer-to-peer car sharing app for urban areas"
+]
+
+# Latency targets per mode, in milliseconds (p95)
+TARGETS_MS = {"fast": 50}
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def benchmark_modes():
+    """Run every idea through each mode twice: cold (cache miss) and warm (cache hit)"""
+    try:
+        from backend.agents.registry import AgentRegistry
+        from dotenv import load_dotenv
+
+        # Load environment variables
+        load_dotenv('backend/.env')
+
+        print("⏱️  BENCHMARKING ANALYSIS MODES")
+        print("=" * 80)
+        print(f"⏰ Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print("=" * 80)
+
+        registry = AgentRegistry()
+
+        summary = {}
+        try:
+            for mode in ("fast", "standard", "deep"):
+                print(f"\n🔍 MODE: {mode}")
+                print("-" * 60)
+
+                timings = {"cold": [], "warm": []}
+                for idea in IDEAS:
+                    # Empty every cache before the cold pass, so it pays the full Gemini and SerpAPI
+                    # cost even when an earlier mode already analysed the same idea
+                    registry.analysis_cache.clear()
+                    registry.serpapi_cache.clear()
+                    await registry.gemini_cache.clear()
+                    for phase in ("cold", "warm"):
+                        start = time.perf_counter()
+                        result = await registry.analyze(idea, deterministic=True, mode=mode)
+                        elapsed_ms = (time.perf_counter() - start) * 1000
+                        timings[phase].append(elapsed_ms)
+
+                    print(f"   {idea[:50]:<50} cold {timings['cold'][-1]:8.1f} ms | warm {timings['warm'][-1]:6.1f} ms | tier {result.get('tier')}")
+
+                summary[mode] = timings
+        finally:
+            await registry.aclose()
+
+        # Summary comparison
+        print("\n" + "=" * 80)
+        print("📊 LATENCY SUMMARY (ms)")
+        print("=" * 80)
+        print(f"{'mode':<10} {'phase':<6} {'p50':>10} {'p95':>10} {'max':>10}")
+
+        all_passed = True
+        for mode, timings in summary.items():
+            for phase, samples in timings.items():
+                p50 = statistics.median(samples)
+                p95 = percentile(samples, 95)
+                print(f"{mode:<10} {phase:<6} {p50:>10.1f} {p95:>10.1f} {max(samples):>10.1f}")
+
+            target = TARGETS_MS.get(mode)
+            if target is not None:
+                p95_cold = percentile(timings["cold"], 95)
+                passed = p95_cold < target
+                all_passed = all_passed and passed
+                print(f"   {'✅' if passed else '❌'} {mode} cold p95 {p95_cold:.1f} ms (target < {target} ms)")
+
+        return all_passed
+
+    except Exception as e:
+        print(f"❌ Benchmark failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = asyncio.run(benchmark_modes())
+    sys.exit(0 if success else 1)
@@ -0,0 +1,94 @@
+import asyncio
+import sys
+sys.path.append('backend')
+
+import pytest
+
+from backend.agents import circuit_breaker
+from backend.agents.circuit_breaker import CircuitBreaker, CircuitOpen
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", fake)
+    return fake
+
+def fail(breaker: CircuitBreaker, error: Exception = RuntimeError("down")):
+    with pytest.raises(type(error)):
+        with breaker.guard():
+            raise error
+
+def test_opens_after_threshold_consecutive_failures(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30)
+    fail(breaker)
+    fail(breaker)
+    assert breaker.state == "closed"
+    fail(breaker)
+    assert breaker.state == "open"
+
+    with pytest.raises(CircuitOpen):
+        breaker.check()
+    assert breaker.stats()["short_circuited"] == 1
+    assert breaker.stats()["times_opened"] == 1
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker("test", failure_threshold=2)
+    fail(breaker)
+    with breaker.guard():
+        pass
+    fail(breaker)
+    assert breaker.state == "closed"
+
+def test_half_open_lets_a_single_probe_through(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+    fail(breaker)
+    clock.now += 30
+
+    breaker.check()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpen):
+        breaker.check()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.check()
+
+def test_failed_probe_reopens_the_circuit(clock):
+    breaker = CircuitBreaker("test", failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        fail(breaker)
+    clock.now += 30
+
+    fail(breaker)
+    assert breaker.state == "open"
+    clock.now += 29
+    with pytest.raises(CircuitOpen):
+        breaker.check()
+
+def test_ignored_errors_do_not_count(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1)
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            with breaker.guard(ignore=(ValueError,)):
+                raise ValueError("bad reply")
+    assert breaker.failures == 0
+    assert breaker.state == "closed"
+
+def test_cancelled_probe_lets_another_probe_through(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+    fail(breaker)
+    clock.now += 30
+
+    with pytest.raises(asyncio.CancelledError):
+        with breaker.guard():
+            raise asyncio.CancelledError()
+    # The cancelled probe gave no verdict on the dependency's health
+    assert breaker.state == "half_open"
+    breaker.check()
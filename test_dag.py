@@ -0,0 +1,144 @@
+import asyncio
+import sys
+sys.path.append('backend')
+
+import pytest
+
+from backend.agents.dag import DAG, DAGRun, Node
+from backend.agents.deadline import Deadline
+
+def constant(value):
+    async def run(inputs, context):
+        return value
+    return run
+
+def test_nodes_receive_their_inputs_and_only_the_target_closure_runs():
+    ran = []
+
+    def node(name, value, inputs=()):
+        async def run(node_inputs, context):
+            ran.append(name)
+            return value(node_inputs) if callable(value) else value
+        return Node(name, run, inputs)
+
+    dag = DAG([
+        node("breakdown", {"industry": "EV"}),
+        node("market", lambda inputs: inputs["breakdown"]["industry"] + " market", ["breakdown"]),
+        node("risks", "unused", ["breakdown"]),
+    ])
+    dag_run = asyncio.run(dag.run({}, targets=["market"]))
+    assert dag_run.values == {"breakdown": {"industry": "EV"}, "market": "EV market"}
+    assert sorted(ran) == ["breakdown", "market"]
+
+def test_declaring_a_node_before_its_inputs_is_rejected():
+    with pytest.raises(ValueError):
+        DAG([Node("market", constant(1), ["breakdown"])])
+    with pytest.raises(ValueError):
+        DAG([Node("a", constant(1)), Node("a", constant(2))])
+
+def test_missed_budget_uses_the_fallback_and_marks_the_node_degraded():
+    async def slow(inputs, context):
+        await asyncio.sleep(1)
+        return "live"
+
+    dag = DAG([Node("market", slow, fallback=constant("local"), budget_share=0.5)])
+    dag_run = asyncio.run(dag.run({}, deadline=Deadline(0.1)))
+    assert dag_run.values["market"] == "local"
+    assert dag_run.degraded == ["market"]
+    assert dag_run.timings["market"]["status"] == "timeout"
+    assert dag_run.timings["market"]["seconds"] < 0.5
+    assert dag.stats()["market"]["fallbacks"] == 1
+
+def test_exceptions_are_retried_before_falling_back():
+    attempts = []
+
+    async def flaky(inputs, context):
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise RuntimeError("transient")
+        return "live"
+
+    dag = DAG([Node("market", flaky, fallback=constant("local"), retries=1)])
+    dag_run = asyncio.run(dag.run({}))
+    assert dag_run.values["market"] == "live"
+    assert dag_run.degraded == []
+    assert dag.stats()["market"]["retries"] == 1
+
+    async def broken(inputs, context):
+        raise RuntimeError("down")
+
+    dag = DAG([Node("market", broken, fallback=constant("local"), retries=2)])
+    dag_run = asyncio.run(dag.run({}))
+    assert dag_run.values["market"] == "local"
+    assert dag_run.timings["market"]["status"] == "failed"
+
+def test_failure_without_fallback_propagates_after_independent_nodes_finish():
+    async def broken(inputs, context):
+        raise RuntimeError("down")
+
+    dag = DAG([Node("market", broken), Node("risks", constant("ok"))])
+    checkpoint = DAGRun()
+    with pytest.raises(RuntimeError):
+        asyncio.run(dag.run({}, resume=checkpoint))
+    assert checkpoint.values == {"risks": "ok"}
+
+def test_resume_reuses_checkpointed_nodes():
+    calls = []
+
+    async def counted(inputs, context):
+        calls.append(1)
+        return "fresh"
+
+    checkpoint = DAGRun()
+    checkpoint.values["breakdown"] = "checkpointed"
+    dag = DAG([Node("breakdown", counted), Node("market", constant("m"), ["breakdown"])])
+    dag_run = asyncio.run(dag.run({}, resume=checkpoint))
+    assert dag_run.values == {"breakdown": "checkpointed", "market": "m"}
+    assert calls == []
+
+def test_local_only_runs_fallbacks_without_marking_them_degraded():
+    async def network(inputs, context):
+        raise AssertionError("network path should not run")
+
+    dag = DAG([
+        Node("breakdown", network, fallback=constant("guess")),
+        Node("market", network, ["breakdown"], fallback=constant("local")),
+    ])
+    dag_run = asyncio.run(dag.run({}, local_only=True))
+    assert dag_run.values == {"breakdown": "guess", "market": "local"}
+    assert dag_run.degraded == []
+    assert dag.stats()["market"]["runs"] == 0
+
+def test_results_stream_in_order_and_internal_nodes_stay_hidden():
+    emitted = []
+
+    async def on_result(name, value):
+        emitted.append(name)
+
+    dag = DAG([
+        Node("source", constant(1), internal=True),
+        Node("breakdown", constant(2), ["source"]),
+        Node("market", constant(3), ["breakdown"]),
+    ])
+    asyncio.run(dag.run({}, on_result=on_result))
+    assert emitted == ["breakdown", "market"]
+
+def test_release_runs_when_the_run_is_cancelled():
+    released = []
+
+    async def scenario():
+        async def slow(inputs, context):
+            await asyncio.sleep(10)
+
+        dag = DAG([
+            Node("prefetch", constant("speculative"), release=released.append),
+            Node("market", slow, ["prefetch"]),
+        ])
+        task = asyncio.create_task(dag.run({}))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert released == ["speculative"]
@@ -0,0 +1,102 @@
+import sys
+sys.path.append('backend')
+
+import pytest
+
+from backend.agents import disk_cache
+from backend.agents.disk_cache import DiskCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(disk_cache.time, "time", fake)
+    return fake
+
+@pytest.fixture
+def make_cache(tmp_path):
+    caches = []
+
+    def make(**kwargs):
+        cache = DiskCache(str(tmp_path / "cache.sqlite"), **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+def test_round_trip_and_expiry_time(clock, make_cache):
+    cache = make_cache()
+    cache.set("k", {"tam": 120, "keywords": ["ev"]}, ttl=60)
+    assert cache.get("k") == {"tam": 120, "keywords": ["ev"]}
+    assert cache.get_with_expiry("k") == ({"tam": 120, "keywords": ["ev"]}, clock.now + 60)
+    assert cache.get("missing") is None
+
+def test_entries_expire_after_their_ttl(clock, make_cache):
+    cache = make_cache()
+    cache.set("short", "a", ttl=10)
+    cache.set("long", "b", ttl=100)
+
+    clock.now += 10
+    assert cache.get("short") is None
+    assert cache.get("long") == "b"
+    assert cache.stats()["entries"] == 1
+
+def test_least_recently_used_entry_is_evicted_by_count(clock, make_cache):
+    cache = make_cache(max_entries=2)
+    cache.set("a", 1, ttl=60)
+    clock.now += 1
+    cache.set("b", 2, ttl=60)
+    clock.now += 1
+    # Reading "a" makes "b" the least recently used
+    assert cache.get("a") == 1
+    clock.now += 1
+    cache.set("c", 3, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_eviction_keeps_total_size_within_max_bytes(clock, make_cache):
+    cache = make_cache(max_bytes=25)
+    for index in range(4):
+        cache.set(f"k{index}", "x" * 8, ttl=60)
+        clock.now += 1
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 25
+    assert cache.get("k3") == "x" * 8
+    assert cache.get("k0") is None
+
+def test_expired_rows_are_dropped_before_lru_eviction(clock, make_cache):
+    cache = make_cache(max_entries=2)
+    cache.set("stale", 1, ttl=5)
+    clock.now += 1
+    cache.set("fresh", 2, ttl=60)
+    clock.now += 10
+    cache.set("new", 3, ttl=60)
+
+    assert cache.get("fresh") == 2
+    assert cache.get("new") == 3
+    assert cache.stats()["evictions"] == 0
+
+def test_entries_survive_reopening(clock, make_cache):
+    make_cache().set("k", [1, 2, 3], ttl=60)
+    assert make_cache().get("k") == [1, 2, 3]
+
+def test_invalidate_and_clear(clock, make_cache):
+    cache = make_cache()
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    cache.clear()
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,128 @@
+import asyncio
+import sys
+sys.path.append('backend')
+
+import pytest
+
+from backend.agents import jobs as jobs_module
+from backend.agents.jobs import JobQueue, JobQueueFull
+
+async def wait_until_finished(queue: JobQueue, job_id: str):
+    while not queue.get(job_id).finished:
+        await asyncio.sleep(0.005)
+    return queue.get(job_id)
+
+def test_job_runs_with_its_options_and_keeps_the_result():
+    async def scenario():
+        async def run(idea, **options):
+            return {"idea": idea, **options}
+
+        queue = JobQueue(run, workers=2)
+        job = queue.submit("EV charging app", mode="fast")
+        assert job.status == "queued"
+        finished = await wait_until_finished(queue, job.id)
+        await queue.aclose()
+        return finished
+
+    job = asyncio.run(scenario())
+    assert job.status == "completed"
+    assert job.result == {"idea": "EV charging app", "mode": "fast"}
+    assert job.to_dict()["finished_at"] >= job.to_dict()["started_at"]
+
+def test_failure_is_recorded_on_the_job():
+    async def scenario():
+        async def run(idea, **options):
+            raise RuntimeError("pipeline exploded")
+
+        queue = JobQueue(run, workers=1)
+        finished = await wait_until_finished(queue, queue.submit("idea").id)
+        await queue.aclose()
+        return finished
+
+    job = asyncio.run(scenario())
+    assert job.status == "failed"
+    assert job.error == "pipeline exploded"
+
+def test_submit_rejects_beyond_max_queued():
+    async def scenario():
+        release = asyncio.Event()
+
+        async def run(idea, **options):
+            await release.wait()
+            return {}
+
+        queue = JobQueue(run, workers=1, max_queued=1)
+        queue.submit("running")
+        await asyncio.sleep(0.01)
+        queue.submit("queued")
+        with pytest.raises(JobQueueFull):
+            queue.submit("rejected")
+        stats = queue.stats()
+        release.set()
+        await queue.aclose()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert stats["rejected"] == 1
+    assert stats["submitted"] == 2
+
+def test_cancel_running_and_queued_jobs():
+    async def scenario():
+        started = asyncio.Event()
+        ran = []
+
+        async def run(idea, **options):
+            ran.append(idea)
+            started.set()
+            await asyncio.sleep(10)
+
+        queue = JobQueue(run, workers=1)
+        running = queue.submit("running")
+        queued = queue.submit("queued")
+        await started.wait()
+
+        assert queue.cancel(queued.id).status == "cancelled"
+        assert queue.cancel(running.id).status == "cancelling"
+        running = await wait_until_finished(queue, running.id)
+        await asyncio.sleep(0.01)
+        await queue.aclose()
+        return running, ran
+
+    running, ran = asyncio.run(scenario())
+    assert running.status == "cancelled"
+    # The queued job was skipped by the worker, never run
+    assert ran == ["running"]
+
+def test_finished_jobs_expire_after_result_ttl(monkeypatch):
+    async def scenario():
+        async def run(idea, **options):
+            return {}
+
+        queue = JobQueue(run, workers=1, result_ttl=60)
+        job = await wait_until_finished(queue, queue.submit("idea").id)
+        finished_at = job.finished_at
+        monkeypatch.setattr(jobs_module.time, "time", lambda: finished_at + 61)
+        expired = queue.get(job.id)
+        await queue.aclose()
+        return expired
+
+    assert asyncio.run(scenario()) is None
+
+def test_aclose_stops_workers_with_a_job_still_running():
+    async def scenario():
+        cancelled = asyncio.Event()
+
+        async def run(idea, **options):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        queue = JobQueue(run, workers=1)
+        queue.submit("running")
+        await asyncio.sleep(0.01)
+        await asyncio.wait_for(queue.aclose(), 1)
+        return cancelled.is_set()
+
+    assert asyncio.run(scenario())
@@ -0,0 +1,78 @@
+import asyncio
+import sys
+import time
+sys.path.append('backend')
+
+import pytest
+
+from backend.agents.rate_governor import QueueTimeout, RateGovernor, RateLimited
+
+def test_burst_is_admitted_immediately_then_paced_by_the_rate():
+    async def scenario():
+        # 600 rpm = one token every 0.1s after a burst of 2
+        governor = RateGovernor("test", requests_per_minute=600, max_concurrency=10, burst=2)
+        admitted_at = []
+        started = time.monotonic()
+
+        async def call():
+            async with governor.slot():
+                admitted_at.append(time.monotonic() - started)
+
+        await asyncio.gather(*(call() for _ in range(4)))
+        return governor, sorted(admitted_at)
+
+    governor, admitted_at = asyncio.run(scenario())
+    assert admitted_at[1] < 0.05
+    assert admitted_at[2] >= 0.08
+    assert admitted_at[3] >= 0.18
+    assert governor.stats()["admitted"] == 4
+    assert governor.stats()["in_flight"] == 0
+
+def test_concurrency_is_capped():
+    async def scenario():
+        governor = RateGovernor("test", requests_per_minute=60_000, max_concurrency=2, burst=10)
+        active = peak = 0
+
+        async def call():
+            nonlocal active, peak
+            async with governor.slot():
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.02)
+                active -= 1
+
+        await asyncio.gather(*(call() for _ in range(6)))
+        return peak
+
+    assert asyncio.run(scenario()) == 2
+
+def test_queue_timeout_rejects_without_leaking_the_slot():
+    async def scenario():
+        governor = RateGovernor("test", requests_per_minute=6, max_concurrency=5, burst=1, queue_timeout=0.05)
+        async with governor.slot():
+            pass
+        with pytest.raises(QueueTimeout):
+            async with governor.slot():
+                pass
+        return governor.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["rejected"] == 1
+    assert stats["waiting"] == 0
+    assert stats["in_flight"] == 0
+
+def test_queue_timeout_is_a_rate_limit():
+    assert issubclass(QueueTimeout, RateLimited)
+
+def test_backoff_drains_the_bucket_and_pauses_new_calls():
+    async def scenario():
+        governor = RateGovernor("test", requests_per_minute=60_000, max_concurrency=5, burst=5)
+        governor.backoff(0.1)
+        started = time.monotonic()
+        async with governor.slot():
+            waited = time.monotonic() - started
+        return governor.stats(), waited
+
+    stats, waited = asyncio.run(scenario())
+    assert waited >= 0.09
+    assert stats["throttled"] == 1
@@ -0,0 +1,105 @@
+import asyncio
+import sys
+sys.path.append('backend')
+
+from backend.agents.singleflight import SingleFlight
+
+def test_concurrent_callers_share_one_execution():
+    async def scenario():
+        flight = SingleFlight()
+        runs = []
+
+        async def work():
+            runs.append(1)
+            await asyncio.sleep(0.01)
+            return {"score": 42}
+
+        results = await asyncio.gather(*(flight.do("idea", work) for _ in range(5)))
+        return flight, runs, results
+
+    flight, runs, results = asyncio.run(scenario())
+    assert len(runs) == 1
+    assert results == [{"score": 42}] * 5
+    stats = flight.stats()
+    assert (stats["calls"], stats["executions"], stats["coalesced"], stats["in_flight"]) == (5, 1, 4, 0)
+
+def test_distinct_keys_and_later_calls_run_again():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0)
+            return "done"
+
+        await asyncio.gather(flight.do("a", work), flight.do("b", work))
+        await flight.do("a", work)
+        return flight.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["executions"] == 3
+    assert stats["coalesced"] == 0
+
+def test_exception_reaches_every_caller_and_is_not_cached():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def boom():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream failed")
+
+        outcomes = await asyncio.gather(flight.do("k", boom), flight.do("k", boom), return_exceptions=True)
+
+        async def ok():
+            return "recovered"
+
+        return outcomes, await flight.do("k", ok)
+
+    outcomes, retried = asyncio.run(scenario())
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    assert retried == "recovered"
+
+def test_one_caller_leaving_does_not_cancel_the_shared_run():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "shared"
+
+        leaver = asyncio.create_task(flight.do("k", work))
+        stayer = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        leaver.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return flight, await stayer, leaver
+
+    flight, result, leaver = asyncio.run(scenario())
+    assert result == "shared"
+    assert leaver.cancelled()
+    assert flight.stats()["abandoned"] == 0
+
+def test_run_is_cancelled_once_every_caller_has_left():
+    async def scenario():
+        flight = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        callers = [asyncio.create_task(flight.do("k", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.wait_for(cancelled.wait(), 1)
+        return flight.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["abandoned"] == 1
+    assert stats["in_flight"] == 0
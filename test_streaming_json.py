@@ -0,0 +1,112 @@
+import asyncio
+import json
+import sys
+sys.path.append('backend')
+
+import pytest
+
+from backend.agents.streaming_json import IncrementalJSONObject, PartialResult
+
+BREAKDOWN = {
+    "business_model": "Subscription, with {braces} and \"quotes\" in text",
+    "geographic_scope": "national",
+    "industry": "EV Infrastructure",
+    "keywords": ["ev", "charging, booking", "maps"],
+    "key_features": [{"name": "booking", "tags": ["a", "b"]}],
+}
+
+def test_fields_are_released_as_soon_as_they_complete():
+    parser = IncrementalJSONObject()
+    assert parser.feed('```json\n{"industry": "E') == {}
+    assert parser.feed('V", "keywords": ["a",') == {"industry": "EV"}
+    assert parser.feed(' "b"]') == {}
+    assert parser.feed("}\n```") == {"keywords": ["a", "b"]}
+    assert parser.complete
+    assert parser.result() == {"industry": "EV", "keywords": ["a", "b"]}
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 17, 1000])
+def test_any_chunking_yields_the_whole_object(chunk_size):
+    text = json.dumps(BREAKDOWN)
+    parser = IncrementalJSONObject()
+    released = {}
+    for start in range(0, len(text), chunk_size):
+        released.update(parser.feed(text[start:start + chunk_size]))
+    assert released == BREAKDOWN
+    assert parser.result() == BREAKDOWN
+
+def test_truncated_or_malformed_replies_raise_value_error():
+    parser = IncrementalJSONObject()
+    parser.feed('{"industry": "EV", "keywords": ["a"')
+    with pytest.raises(ValueError):
+        parser.result()
+
+    with pytest.raises(ValueError):
+        IncrementalJSONObject().feed('{"industry": EV, "x": 1}')
+
+def test_empty_object():
+    parser = IncrementalJSONObject()
+    assert parser.feed("{}") == {}
+    assert parser.result() == {}
+
+def test_waiters_resume_once_their_fields_arrive():
+    async def scenario():
+        partial = PartialResult()
+        market = asyncio.create_task(partial.wait_for(["industry", "keywords"]))
+        await asyncio.sleep(0)
+        partial.update({"industry": "EV"})
+        await asyncio.sleep(0)
+        assert not market.done()
+        partial.update({"keywords": ["ev"]})
+        return await asyncio.wait_for(market, 1)
+
+    assert asyncio.run(scenario()) == {"industry": "EV", "keywords": ["ev"]}
+
+def test_settle_keeps_streamed_fields_and_fills_the_rest():
+    async def scenario():
+        partial = PartialResult()
+        waiter = asyncio.create_task(partial.wait_for(["industry", "target_market"]))
+        partial.update({"industry": "EV"})
+        settled = partial.settle({"industry": "Technology", "target_market": "drivers"})
+        partial.update({"industry": "ignored after finish"})
+        return settled, await waiter, await partial.complete()
+
+    settled, waited, complete = asyncio.run(scenario())
+    assert settled == {"industry": "EV", "target_market": "drivers"}
+    assert waited == settled
+    assert complete == settled
+
+def test_finish_releases_waiters_with_the_fields_that_exist():
+    async def scenario():
+        partial = PartialResult()
+        waiter = asyncio.create_task(partial.wait_for(["industry", "missing"]))
+        await asyncio.sleep(0)
+        partial.finish({"industry": "EV"})
+        return await waiter
+
+    assert asyncio.run(scenario()) == {"industry": "EV"}
+
+def test_complete_waits_for_the_producer():
+    async def scenario():
+        partial = PartialResult()
+
+        async def produce():
+            await asyncio.sleep(0.01)
+            partial.finish({"industry": "EV"})
+
+        partial.producer = asyncio.create_task(produce())
+        return await partial.complete()
+
+    assert asyncio.run(scenario()) == {"industry": "EV"}
+
+def test_streamed_fields_of_the_wrong_type_are_dropped_before_release():
+    from backend.agents.gemini_schemas import BREAKDOWN_SCHEMA, FUSED_BREAKDOWN_SCHEMA
+
+    parser = IncrementalJSONObject()
+    released = parser.feed('{"industry": "EV", "keywords": "ev, charging", "key_features": ["maps"]}')
+    assert BREAKDOWN_SCHEMA.validate_fields(released) == {"industry": "EV", "key_features": ["maps"]}
+
+    competitors = {"suggested_competitors": [{"name": "ChargePoint", "funding": 700, "market_share": 10, "description": "d"}]}
+    assert FUSED_BREAKDOWN_SCHEMA.validate_fields(competitors) == {
+        "suggested_competitors": [{"name": "ChargePoint", "funding": 700.0, "market_share": 10.0, "description": "d"}]
+    }
+    assert BREAKDOWN_SCHEMA.validate_fields(competitors) == {}